@@ -0,0 +1,109 @@
+# moves per second: one Board at a time vs a whole BatchBoard at once.
+# boards play random moves; a "move" is one move() attempt on a live board.
+# first it checks BatchBoard still plays exactly like Board, and exits with status 1 if it doesn't.
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from pydive.engine import Board
+from pydive.batch import BatchBoard, DIRECTIONS
+
+GAMES = 2000
+STEPS = 100
+CASES = [(1, 4, 4), (1, 8, 8), (2, 4, 4), (3, 4, 4), (0, 6, 6)]
+
+# the check: boards per batch, moves each, and the (mode, width, height)s, odd shapes included
+CHECK_GAMES = 40
+CHECK_STEPS = 200
+CHECK_CASES = [(mode, width, height) for mode in range(4) for width, height in [(4, 4), (3, 5), (1, 4), (6, 6), (2, 2), (5, 1)]]
+
+# play the same random moves on some Boards and on a BatchBoard made from them.
+# the batch spawns tiles from its own rng, so they're copied onto the Boards after every move.
+# returns a description of the first difference, or None if there aren't any
+def check_case(mode, width, height):
+    rng = random.Random(mode*100+width*10+height)
+    boards = []
+    for n in range(CHECK_GAMES):
+        board = Board(width, height, mode, rng.getrandbits(64))
+        board.setup()
+        # rocks don't move and 0 merges with anything, make sure the batch knows that too
+        if n % 8 == 0:
+            board.set_tile(0, 0, "rock")
+        elif n % 8 == 4:
+            board.set_tile(width-1, height-1, 0)
+        boards.append(board)
+    batch = BatchBoard.from_boards(boards, seed=mode)
+
+    for step in range(CHECK_STEPS):
+        directions = [rng.choice(DIRECTIONS) for board in boards]
+        expected = [board.move(direction, preview=True) for board, direction in zip(boards, directions)]
+        moved = batch.move(directions)
+
+        for n, board in enumerate(boards):
+            where = f"mode {mode} {width}x{height}, board {n}, move {step+1} ({directions[n]})"
+            if bool(moved[n]) != bool(expected[n]):
+                return f"{where}: batch says moved={bool(moved[n])}, Board says {bool(expected[n])}"
+            got = batch.board(n)
+            if expected[n]:
+                for i in range(width):
+                    for j in range(height):
+                        if board.tiles[i][j] != got.tiles[i][j]:
+                            if board.tiles[i][j] != None or got.tiles[i][j] not in board.seeds:
+                                return f"{where}: cell {i},{j} is {got.tiles[i][j]}, Board has {board.tiles[i][j]}"
+                            board.set_tile(i, j, got.tiles[i][j])
+                board.check_for_game_over()
+                if board.game_over:
+                    board.all_seeds.sort()
+            for name in ["tiles", "score", "seeds", "all_seeds", "game_over"]:
+                if getattr(board, name) != getattr(got, name):
+                    return f"{where}: {name} is {getattr(got, name)}, Board has {getattr(board, name)}"
+    return None
+
+def bench_scalar(mode, width, height, games, steps):
+    rng = random.Random(0)
+    moves = 0
+    t = time.perf_counter()
+    for n in range(games):
+        board = Board(width, height, mode)
+        board.setup()
+        for i in range(steps):
+            if board.game_over:
+                break
+            board.move(rng.choice(DIRECTIONS))
+            moves += 1
+    return moves/(time.perf_counter()-t)
+
+def bench_batch(mode, width, height, games, steps):
+    rng = np.random.default_rng(0)
+    moves = 0
+    t = time.perf_counter()
+    batch = BatchBoard(games, width, height, mode, seed=0)
+    batch.setup()
+    for i in range(steps):
+        moves += int((~batch.game_over).sum())
+        batch.move(np.array(DIRECTIONS)[rng.integers(0, 4, games)])
+    return moves/(time.perf_counter()-t)
+
+def main():
+    for mode, width, height in CHECK_CASES:
+        difference = check_case(mode, width, height)
+        if difference != None:
+            print(f"BatchBoard doesn't match Board! {difference}")
+            return 1
+    print(f"BatchBoard matches Board ({len(CHECK_CASES)*CHECK_GAMES} games, {CHECK_STEPS} moves each)")
+
+    print(f"{'mode':>4} {'size':>6} {'scalar moves/s':>15} {'batch moves/s':>15} {'speedup':>8}")
+    for mode, width, height in CASES:
+        # the scalar engine gets fewer games, it's slow enough already
+        scalar = bench_scalar(mode, width, height, GAMES//10, STEPS)
+        batch = bench_batch(mode, width, height, GAMES, STEPS)
+        print(f"{mode:>4} {f'{width}x{height}':>6} {scalar:>15.0f} {batch:>15.0f} {batch/scalar:>7.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
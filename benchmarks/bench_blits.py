@@ -0,0 +1,61 @@
+# drawing a layer of tiles the way dive.py does: a full 10x10 board and a 60 tile svalbard page,
+# a blit per tile against one blits (and fblits, on pygame-ce) call for the whole layer.
+# runs headless, the tiles are stand-ins the same size as the game's at the default window size.
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame as pg
+
+# (name, tiles across, tiles down, tile size, border).
+# the last one is 1 pixel tiles, so it's nearly all call overhead and no drawing
+CASES = [("board 10x10", 10, 10, 45, 8), ("svalbard", 10, 6, 82, 8), ("overhead", 10, 10, 1, 0)]
+FRAMES = 2000
+# best of this many runs, it's quick enough to be noisy
+REPEATS = 5
+
+def layer(columns, rows, size, border):
+    tiles = []
+    for n in range(columns*rows):
+        t = pg.Surface((size, size), pg.SRCALPHA)
+        t.fill(pg.Color(40+n*7 % 200, 90, 160-n*3 % 150))
+        pg.draw.circle(t, pg.Color(255, 255, 255, 128), (size*0.5, size*0.5), size*0.3)
+        tiles.append((t, [border+(n % columns)*(size+border), border+(n//columns)*(size+border)]))
+    return tiles
+
+def one_by_one(surf, tiles):
+    for t, pos in tiles:
+        surf.blit(t, pos)
+
+def batched(surf, tiles):
+    surf.blits(tiles, doreturn=False)
+
+def fast_batched(surf, tiles):
+    surf.fblits(tiles)
+
+def frame_time(draw, surf, tiles):
+    best = None
+    for n in range(REPEATS):
+        t = time.perf_counter()
+        for i in range(FRAMES):
+            draw(surf, tiles)
+        t = (time.perf_counter()-t)/FRAMES
+        best = t if best == None else min(best, t)
+    return best*1e6
+
+def main():
+    pg.init()
+    pg.display.set_mode((1, 1))
+    draws = [one_by_one, batched]
+    if hasattr(pg.Surface, "fblits"):
+        draws.append(fast_batched)
+    print(f"{'layer':>12} {'tiles':>6} {'blit us':>10} {'blits us':>10} {'fblits us':>10}")
+    for name, columns, rows, size, border in CASES:
+        surf = pg.Surface((border+columns*(size+border), border+rows*(size+border)), pg.SRCALPHA)
+        tiles = layer(columns, rows, size, border)
+        results = [frame_time(draw, surf, tiles) for draw in draws]
+        print(f"{name:>12} {len(tiles):>6} " + " ".join(f"{r:>10.1f}" for r in results) + ("" if len(results) == 3 else f" {'-':>10}"))
+
+if __name__ == "__main__":
+    main()
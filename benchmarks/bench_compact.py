@@ -0,0 +1,78 @@
+# memory per board, copy cost, move cost and whole games: Board vs CompactBoard.
+# boards are measured mid-game (after some random moves), preview boards and all.
+# the move timed is a legal one, so it's never a move that does nothing.
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydive.engine import Board
+from pydive.compact import CompactBoard
+
+SIZES = [(4, 4), (6, 6), (10, 10)]
+DIRECTIONS = ["left", "right", "up", "down"]
+# whole random games per size, for moves per second
+GAMES = 20
+
+# everything reachable from obj, counted once
+def deep_size(obj, seen=None):
+    if seen == None:
+        seen = set()
+    if id(obj) in seen or obj == None or isinstance(obj, (bool, str)):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen)+deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_size(x, seen) for x in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_size(getattr(obj, slot), seen)
+    return size
+
+def play(board, moves):
+    rng = random.Random(0)
+    for i in range(moves):
+        board.move(rng.choice(DIRECTIONS))
+    return board
+
+# moves per second over whole games of random legal moves
+def games_speed(board_type, width, height):
+    rng = random.Random(0)
+    moves = 0
+    t = time.perf_counter()
+    for n in range(GAMES):
+        board = board_type(width, height, 1, rng.getrandbits(64))
+        board.setup()
+        while not board.game_over:
+            legal_moves = board.legal_moves()
+            if len(legal_moves) == 0:
+                break
+            board.move(rng.choice(legal_moves))
+            moves += 1
+    return moves/(time.perf_counter()-t)
+
+def main():
+    print(f"{'size':>6} {'board':>13} {'bytes':>7} {'copy us':>8} {'move us':>8} {'games moves/s':>14}")
+    for width, height in SIZES:
+        for board_type in (Board, CompactBoard):
+            board = board_type(width, height, 1, 0)
+            board.setup()
+            play(board, width*height//2)
+            direction = board.legal_moves()[0]
+            board.preview_move(direction)
+            assert board.copy().move(direction, preview=True), f"{direction} didn't move"
+
+            copy_time = min(timeit.repeat(board.copy, number=2000, repeat=5))/2000
+            move_time = min(timeit.repeat(lambda: board.copy().move(direction, preview=True), number=500, repeat=5))/500-copy_time
+            speed = games_speed(board_type, width, height)
+            print(f"{f'{width}x{height}':>6} {board_type.__name__:>13} {deep_size(board):>7} {copy_time*1e6:>8.2f} {move_time*1e6:>8.2f} {speed:>14.0f}")
+
+if __name__ == "__main__":
+    main()
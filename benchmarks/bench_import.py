@@ -0,0 +1,44 @@
+# how long does a fresh interpreter take to import the engine?
+# simulation workers pay this once per process, so keep it well under the budget.
+# exits with status 1 if the import is over budget or drags pygame in.
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BUDGET_MS = 50
+RUNS = 20
+
+# the import we time, measured from inside the child so interpreter startup doesn't count
+CHILD = """
+import sys, time
+t = time.perf_counter()
+import pydive
+import pydive.engine
+t = time.perf_counter()-t
+print(t*1000, 'pygame' in sys.modules)
+"""
+
+def time_import():
+    out = subprocess.run([sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    return float(out[0]), out[1] == "True"
+
+def main():
+    times = []
+    for i in range(RUNS):
+        ms, has_pygame = time_import()
+        if has_pygame:
+            print("importing pydive pulled in pygame!")
+            return 1
+        times.append(ms)
+    times.sort()
+    print(f"import pydive: best {times[0]:.2f} ms, median {times[len(times)//2]:.2f} ms, worst {times[-1]:.2f} ms ({RUNS} runs)")
+    if times[len(times)//2] > BUDGET_MS:
+        print(f"over budget! ({BUDGET_MS} ms)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# seed discovery on big tiles and long seed lists, like a late game:
+# find_new_seed against the old trial division walk, and factorize cold and cached.
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydive import engine, primes
+
+# (how many primes multiply into a tile, how many seeds, whether seeds can be composite)
+CASES = [(4, 8, False), (8, 15, False), (12, 15, False), (4, 8, True), (8, 16, True), (10, 24, True), (12, 32, True)]
+TILES = 50
+SMALL_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47]
+
+# find_new_seed before factorize: every live seed tries every number on the way down
+def trial_division_seed(new_tile, seeds):
+    potentials = {abs(new_tile)}
+    smallest = abs(new_tile)
+    while len(potentials) > 0:
+        test = potentials.pop()
+        for seed in seeds:
+            if test % seed == 0:
+                if test == seed:
+                    return None
+                potentials.add(test//seed)
+        if smallest > test:
+            smallest = test
+    return smallest
+
+def timed(function, args):
+    t = time.perf_counter()
+    for arg in args:
+        function(*arg)
+    return (time.perf_counter()-t)/len(args)*1e6
+
+def main():
+    rng = random.Random(0)
+    print(f"{'primes':>6} {'seeds':>6} {'composite':>9} {'old us':>9} {'new us':>9} {'again us':>9} {'factor us':>10} {'again us':>9}")
+    for size, seed_count, composite in CASES:
+        if composite:
+            seeds = sorted(set(rng.choice(SMALL_PRIMES)*rng.choice([1, 1, 1, 2, 3, 5]) for i in range(seed_count*3)))[:seed_count]
+        else:
+            seeds = SMALL_PRIMES[:seed_count]
+        tiles = []
+        for n in range(TILES):
+            tile = 1
+            for i in range(size):
+                tile *= rng.choice(SMALL_PRIMES)
+            # the odd big prime factor, like a long game eventually makes
+            tiles.append(tile*rng.choice([1, 1, 1000003, 2**61-1]))
+
+        old = timed(trial_division_seed, [(tile, seeds) for tile in tiles])
+        primes.factorize.cache_clear()
+        cold = timed(primes.factorize, [(tile,) for tile in tiles])
+        cached = timed(primes.factorize, [(tile,) for tile in tiles])
+        engine._find_new_seed.cache_clear()
+        new = timed(engine.find_new_seed, [(tile, seeds) for tile in tiles])
+        again = timed(engine.find_new_seed, [(tile, seeds) for tile in tiles])
+        print(f"{size:>6} {len(seeds):>6} {str(composite):>9} {old:>9.1f} {new:>9.1f} {again:>9.2f} {cold:>10.1f} {cached:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# how fast the solver searches: nodes per second, how deep it gets and how often
+# the transposition table saves it the work, on mid-game positions.
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydive.compact import CompactBoard
+from pydive.solver import Solver
+
+CASES = [(1, 3, 3), (1, 4, 4), (0, 4, 4), (3, 4, 4), (1, 5, 3), (1, 6, 6)]
+POSITIONS = 5
+BUDGET_MS = 200
+
+# a position some random moves into a game
+def position(mode, width, height, seed):
+    rng = random.Random(seed)
+    board = CompactBoard(width, height, mode, seed)
+    board.setup()
+    for i in range(width*height*2):
+        legal_moves = board.legal_moves()
+        if len(legal_moves) == 0:
+            break
+        board.move(rng.choice(legal_moves))
+    return board
+
+def main():
+    print(f"{'mode':>4} {'size':>6} {'nodes/s':>9} {'depth':>6} {'hit rate':>9}")
+    for mode, width, height in CASES:
+        solver = Solver(seed=0)
+        elapsed = 0
+        depth = 0
+        for n in range(POSITIONS):
+            board = position(mode, width, height, n)
+            t = time.perf_counter()
+            solver.best_move(board, BUDGET_MS)
+            elapsed += time.perf_counter()-t
+            depth += solver.depth
+        print(f"{mode:>4} {f'{width}x{height}':>6} {solver.nodes/elapsed:>9.0f} {depth/POSITIONS:>6.1f} {solver.hit_rate():>9.1%}")
+
+if __name__ == "__main__":
+    main()
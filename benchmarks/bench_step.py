@@ -0,0 +1,102 @@
+# replaying logged games: Board.move (with the animation bookkeeping) against
+# Board.step and apply_moves (without), plus CompactBoard for comparison.
+# then a long game on a big board, checking the memory it holds on to stays bounded.
+# exits with status 1 if it doesn't.
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydive import engine, replay
+from pydive.compact import CompactBoard
+
+SIZES = [(4, 4), (6, 6), (10, 10)]
+GAMES = 20
+# best of this many runs, replays are quick enough to be noisy
+REPEATS = 3
+
+# a board with lines longer than the engine caches, played for this many moves.
+# the board itself is a few MB, anything much past that is caches growing
+BIG_SIZE = (200, 200)
+BIG_MOVES = 1000
+BIG_BUDGET_MB = 64
+
+# whole random games, as replay logs
+def logs(width, height):
+    rng = random.Random(0)
+    games = []
+    for n in range(GAMES):
+        board = engine.Board(width, height, 1, rng.getrandbits(64))
+        board.setup()
+        while not board.game_over:
+            legal_moves = board.legal_moves()
+            if len(legal_moves) == 0:
+                break
+            board.step(rng.choice(legal_moves))
+        games.append(replay.game_log(board))
+    return games
+
+def replay_with(games, board_type, play):
+    best = 0
+    for n in range(REPEATS):
+        t = time.perf_counter()
+        moves = 0
+        for seed, mode, (width, height), letters in games:
+            board = board_type(width, height, mode, seed)
+            board.setup()
+            play(board, letters)
+            moves += len(letters)
+        best = max(best, moves/(time.perf_counter()-t))
+    return best
+
+def by_move(board, letters):
+    for letter in letters:
+        board.move(replay.LETTER_MOVES[letter])
+
+def by_step(board, letters):
+    for letter in letters:
+        board.step(replay.LETTER_MOVES[letter])
+
+# (MB still allocated after the game, moves/s) for each board type
+def big_game(board_type):
+    width, height = BIG_SIZE
+    rng = random.Random(0)
+    tracemalloc.start()
+    board = board_type(width, height, 1, 0)
+    board.setup()
+    t = time.perf_counter()
+    moves = 0
+    while moves < BIG_MOVES and not board.game_over:
+        board.step(rng.choice(board.legal_moves()))
+        moves += 1
+    t = time.perf_counter()-t
+    memory = tracemalloc.get_traced_memory()[0]/2**20
+    tracemalloc.stop()
+    return memory, moves/t
+
+def main():
+    print(f"{'size':>6} {'move':>9} {'step':>9} {'apply':>9} {'compact':>9}  (moves/s)")
+    for width, height in SIZES:
+        games = logs(width, height)
+        results = [replay_with(games, engine.Board, by_move),
+                   replay_with(games, engine.Board, by_step),
+                   replay_with(games, engine.Board, engine.apply_moves),
+                   replay_with(games, CompactBoard, engine.apply_moves)]
+        print(f"{f'{width}x{height}':>6} " + " ".join(f"{r:>9.0f}" for r in results))
+
+    width, height = BIG_SIZE
+    over = False
+    for board_type in [engine.Board, CompactBoard]:
+        memory, speed = big_game(board_type)
+        print(f"{board_type.__name__} {width}x{height}, {BIG_MOVES} moves: {memory:.1f} MB held, {speed:.0f} moves/s")
+        over = over or memory > BIG_BUDGET_MB
+    if over:
+        print(f"over budget! ({BIG_BUDGET_MB} MB)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
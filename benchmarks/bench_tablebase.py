@@ -0,0 +1,53 @@
+# tablebases for the small boards: how long each takes to build, how big the file is
+# and how long a lookup takes on positions from real games.
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydive import tablebase
+from pydive.compact import CompactBoard
+
+SIZES = [(1, 3), (1, 4), (1, 5), (2, 2), (2, 3), (3, 3)]
+MODE = 1
+GAMES = 50
+
+# every position of some random games, while they're still inside the table
+def positions(width, height, max_sum):
+    rng = random.Random(0)
+    boards = []
+    for n in range(GAMES):
+        board = CompactBoard(width, height, MODE, rng.getrandbits(64))
+        board.setup()
+        while not board.game_over and tablebase.tile_sum(board) <= max_sum:
+            boards.append(board.copy())
+            legal_moves = board.legal_moves()
+            if len(legal_moves) == 0:
+                break
+            board.move(rng.choice(legal_moves))
+    return boards
+
+def main():
+    print(f"{'size':>5} {'max sum':>8} {'positions':>10} {'build s':>8} {'file KiB':>9} {'lookup us':>10} {'found':>6}")
+    with tempfile.TemporaryDirectory() as folder:
+        for width, height in SIZES:
+            path = os.path.join(folder, f"{width}x{height}.tb")
+            t = time.perf_counter()
+            count = tablebase.build(width, height, MODE, path)
+            build_time = time.perf_counter()-t
+
+            table = tablebase.Tablebase(path)
+            boards = positions(width, height, table.max_sum)
+            t = time.perf_counter()
+            found = sum(table.lookup(board) != None for board in boards)
+            lookup_time = (time.perf_counter()-t)/max(len(boards), 1)
+            table.close()
+
+            print(f"{f'{width}x{height}':>5} {table.max_sum:>8} {count:>10} {build_time:>8.2f} "
+                  f"{os.path.getsize(path)/1024:>9.0f} {lookup_time*1e6:>10.1f} {found/max(len(boards), 1):>6.0%}")
+
+if __name__ == "__main__":
+    main()
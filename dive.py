@@ -4,6 +4,13 @@ import random
 import math
 import pickle
 import csv
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+import pydive.engine as engine
+import pydive.replay as replay
+import pydive.hint as hint
+import pydive.primes as primes
 
 VERSION = "0.2.0"
 
@@ -11,12 +18,26 @@ DISPLAY_SIZE = (1080, 720)
 DISPLAY_WIDTH, DISPLAY_HEIGHT = DISPLAY_SIZE
 FPS = 60
 
+# biggest board the settings allow
+MAX_BOARD_SIZE = 1000
+# boards that would need smaller tiles than this to fit get zoomed and panned around instead
+MIN_TILE_SIZE = 24
+# how far they zoom, as multiples of MIN_TILE_SIZE
+MIN_ZOOM = 0.5
+MAX_ZOOM = 4.0
+# tiles smaller than this are drawn without numbers or sprites
+SMALL_TILE_SIZE = 16
+
 # keybinds, change these if you want
 KEYBINDS = {"up": {pg.K_w, pg.K_UP}, 
             "left": {pg.K_a, pg.K_LEFT}, 
             "down": {pg.K_s, pg.K_DOWN}, 
             "right": {pg.K_d, pg.K_RIGHT},
             "restart": {pg.K_y},
+            "undo": {pg.K_z},
+            "redo": {pg.K_x},
+            "hint": {pg.K_h},
+            "debug": {pg.K_F3},
             "preview": {pg.K_LSHIFT, pg.K_RSHIFT}
             }
 
@@ -36,6 +57,8 @@ PRIMES = [7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
     131, 137, 139, 149, 151, 157, 163, 167, 173, 179, 181, 191, 193, 197,
     199, 211, 223, 227, 229, 233, 239, 241, 251, 257, 263, 269, 271, 277,
     281, 283, 293, 307, 311, 313, 317, 331, 337, 347, 349, 353, 359, 367]
+# where each prime's sprite is in prime_sprites
+PRIME_INDEX = {prime: i for i, prime in enumerate(PRIMES)}
 TYPABLE_CHARS = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z',
                  'A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z',
                  '0','1','2','3','4','5','6','7','8','9','_']
@@ -43,312 +66,24 @@ TYPABLE_NUMS = ['0','1','2','3','4','5','6','7','8','9',]
 
 GAMEMODE_DESCRIPTIONS = ["pydive (in development)", "classic dive", "permanent seeds", "2, 3, 5, 7 only"]
 
-class Board:
-    
-    def __init__(self, width, height, mode=1):
-
-        # basic variables
-        self.width = width
-        self.height = height
-        self.mode = mode
-        self.game_over = False
-
-        self.tiles = [[None for i in range(self.height)] for j in range(self.width)]
-
-        # "fake" tiles for animation
-        # each anim_tile is a tuple containing
-        # (start pos, start tile, end pos, end tile)
-        self.anim_tiles = []
-
-        # seeds
-        # you already know what seeds are
-        self.seeds = []
-        self.all_seeds = []
-
-        # "fake" seeds for animation
-        # (seed, start index, end index)
-        self.anim_seeds = []
-
-        self.score = 0
-        self.anim_score = 0
-
-        self.preview_board = None
-
-        # savescum prevention
-        self.tainted = False
-
-    def setup(self):
-        if self.mode == 0:
-            self.seeds = [2]
-        elif self.mode == 1:
-            self.seeds = [2]
-        elif self.mode == 2:
-            self.seeds = [2]
-        elif self.mode == 3:
-            self.seeds = [2,3,5,7]
-        self.all_seeds = [x for x in self.seeds]
-        self.spawn_tiles(2)
-
-    # check if a new tile unlocks any seeds
-    # returns the new seed, or None if there is no new seed
-    def check_for_new_seed(self, new_tile):
-
-        # nope, not dealing with you.
-        if new_tile == 0 or new_tile == None:
-            return None
-        
-        # set of potential new seeds
-        potentials = {abs(new_tile)}
-        smallest = abs(new_tile)
-
-        while len(potentials) > 0:
-
-            # take a potential seed
-            test = potentials.pop()
-
-            # divide it by each of the existing seeds
-            for seed in self.seeds:
-                if test % seed == 0:
-
-                    # if the result is 1, no new seed
-                    if test == seed or test == -seed:
-                        return None
-                    
-                    # otherwise, add it to the set
-                    potentials.add(test//seed)
-
-            # keep track of the smallest seed
-            if smallest > test:
-                smallest = test
-        
-        return smallest
-    
-    def remove_seeds(self):
-
-        removed_seeds = []
-        for seed in self.seeds:
-            remove = True
-            for i in range(self.width):
-                for j in range(self.height):
-                    if self.tiles[i][j] == None or self.tiles[i][j] == "rock":
-                        continue
-                    if self.tiles[i][j] % seed == 0:
-                        remove = False
-            if remove:
-                # Score for removing a seed
-                self.score += seed
-                removed_seeds.append(seed)
-        
-        self.seeds = [i for i in self.seeds if i not in removed_seeds]
-
-    # check whether 
-    def check_for_game_over(self):
-
-        # if any tiles are empty, game is not over
-        for i in range(self.width):
-            for j in range(self.height):
-                if self.tiles[i][j] == None:
-                    return
-                
-        # if any two adjacent tiles are mergeable, game is not over
-        for i in range(self.width):
-            for j in range(self.height-1):
-                if check_merge(self.tiles[i][j], self.tiles[i][j+1]) != None:
-                    return
-        for i in range(self.width-1):
-            for j in range(self.height):
-                if check_merge(self.tiles[i][j], self.tiles[i+1][j]) != None:
-                    return
-        
-        self.game_over = True
-    
-    # spawn tiles in empty tiles
-    def spawn_tiles(self, count):
-
-        if len(self.seeds) == 0:
-            return
-
-        # find all empty tiles
-        possible_positions = []
-
-        for i in range(self.width):
-            for j in range(self.height):
-
-                if self.tiles[i][j] == None:
-                    possible_positions.append((i, j))
-        
-        if len(possible_positions) == 0:
-            return
-        
-        # add tiles randomly from the list of seeds
-        for n in range(min(len(possible_positions), count)): 
-
-            position = random.choice(possible_positions)
-            tile = random.choice(self.seeds)
-
-            self.anim_tiles.append((position, None, position, tile))
-            self.tiles[position[0]][position[1]] = tile
-
-            possible_positions.remove(position)
-
-    # slide all tiles in a single direction, merging where possible
-    # returns list of all newly merged tiles
-    def slide_and_merge_tiles(self, dx, dy):
-        
-        # loop in the opposite direction of movement
-        if dx > 0:
-            irange = range(self.width-1, -1, -1)
-        else:
-            irange = range(self.width)
-
-        if dy > 0:
-            jrange = range(self.height-1, -1, -1)
-        else:
-            jrange = range(self.height)
-
-        merged_tiles = []
-        new_tiles = []
-        move_worked = False
-        for i in irange:
-            for j in jrange:
-
-                # don't care about empty tiles
-                if self.tiles[i][j] == None:
-                    continue
-
-                if self.tiles[i][j] == "rock":
-                    self.anim_tiles.append(((i, j), self.tiles[i][j], (i, j), self.tiles[i][j]))
-                    continue
-
-                # check tiles in the direction of motion until we either hit the wall or another tile
-                x = i
-                y = j
-                while x+dx >= 0 and x+dx <= self.width-1 and y+dy >= 0 and y+dy <= self.height-1 and self.tiles[x+dx][y+dy] == None:
-                    x += dx
-                    y += dy
-                
-                # if we aren't on the edge, that means we were stopped by a tile
-                # but we can't merge with a tile that already merged, so that's just as good as an edge
-                if x+dx >= 0 and x+dx <= self.width-1 and y+dy >= 0 and y+dy <= self.height-1 and not (x+dx, y+dy) in merged_tiles: 
-                    
-                    # check if the tiles are mergeable
-                    new_tile = check_merge(self.tiles[i][j], self.tiles[x+dx][y+dy])
-
-                    if new_tile != None:
-                        
-                        # merged tiles can't merge again
-                        merged_tiles.append((x+dx, y+dy))
-                        new_tiles.append(new_tile)
-
-                        # add score
-                        self.score += min(self.tiles[x+dx][y+dy], self.tiles[i][j])
-                        
-                        # add merge animation
-                        self.anim_tiles.append(((i, j), self.tiles[i][j], (x+dx, y+dy), new_tile))
+# the rules live in pydive.engine, this just adds the drawing.
+# (keep the name: old profiles pickled their boards as __main__.Board)
+class Board(engine.Board):
 
-                        # merge tiles
-                        self.tiles[x+dx][y+dy] = new_tile
-                        self.tiles[i][j] = None
-
-                        move_worked = True
-                        continue
-                
-                # check if the tile moved
-                if x != i or y != j:
-                    # move the tile
-                    self.tiles[x][y] = self.tiles[i][j]
-                    self.tiles[i][j] = None
-                    move_worked = True
-
-                # add animation
-                self.anim_tiles.append(((i, j), self.tiles[x][y], (x, y), self.tiles[x][y]))
-
-        return new_tiles if move_worked else None
-    
-    def preview_move(self, direction):
-
-        self.preview_board = Board(self.width, self.height, self.mode)
-        self.preview_board.tiles = [[i for i in j] for j in self.tiles]
-        self.preview_board.seeds = [i for i in self.seeds]
-        self.preview_board.tainted = self.tainted
-
-        self.preview_board.move(direction, preview=True)
-
-    # perform one full move of the game
-    # returns whether or not the move was successful
-    def move(self, direction, preview=False):
-
-        if self.game_over:
-            return False
-        
-        self.anim_tiles = []
-        self.anim_score = self.score
-
-        if direction == "right":
-            new_tiles = self.slide_and_merge_tiles(1, 0)
-        elif direction == "down":
-            new_tiles = self.slide_and_merge_tiles(0, 1)
-        elif direction == "left":
-            new_tiles = self.slide_and_merge_tiles(-1, 0)
-        elif direction == "up":
-            new_tiles = self.slide_and_merge_tiles(0, -1)
-        else:
-            return False
-        
-        if new_tiles == None:
-            return False
-        
-        # do seed math
-        if self.mode == 0 or self.mode == 1 or self.mode == 2:
-
-            self.anim_seeds = []
-            old_seeds = [x for x in self.seeds]
-
-            # find and add new seeds
-            new_seeds = list(set([self.check_for_new_seed(i) for i in new_tiles]))
-            if None in new_seeds:
-                new_seeds.remove(None)
-            new_seeds.sort()
-            self.seeds += new_seeds
-
-            # remove old seeds
-            if self.mode == 0 or self.mode == 1:
-
-                self.remove_seeds()
-
-            # seed animation
-            for i, seed in enumerate(old_seeds):
-                if seed in self.seeds:
-                    self.anim_seeds.append((seed, i, self.seeds.index(seed)))
-                else:
-                    self.anim_seeds.append((seed, i, None))
-            
-            for i, seed in enumerate(self.seeds):
-                if seed not in self.all_seeds:
-                    self.all_seeds.append(seed)
-                if seed not in old_seeds:
-                    self.anim_seeds.append((seed, None, i))
-        
-        else:
-
-            self.anim_seeds = [(seed, i, i) for i, seed in enumerate(self.seeds)]
-
-        # spawn a new tile
-        if not preview:
-            self.spawn_tiles(1)
-
-            self.check_for_game_over()
-            if self.game_over:
-                self.all_seeds.sort()
-            
-        return True
+    # a preview board doesn't change until the next move (it's cached in lookahead),
+    # so it only gets drawn once: (size, border, surface)
+    preview_surf = None
+    preview_seed_surf = None
     
     def display_seed_list(self, seed_size, border, columns, anim_timer, preview=False):
 
         if preview:
-            s = self.preview_board.display_seed_list(seed_size, border, columns, 1.0)
-            s.fill(pg.Color(15, 15, 15), special_flags=pg.BLEND_RGBA_ADD)
-            return s
+            preview_board = self.preview_board
+            if preview_board.preview_seed_surf == None or preview_board.preview_seed_surf[:3] != (seed_size, border, columns):
+                s = preview_board.display_seed_list(seed_size, border, columns, 1.0)
+                s.fill(pg.Color(15, 15, 15), special_flags=pg.BLEND_RGBA_ADD)
+                preview_board.preview_seed_surf = (seed_size, border, columns, s)
+            return preview_board.preview_seed_surf[3]
 
         if anim_timer < 1.0:
             rows = math.ceil(max(len([1 for x in self.anim_seeds if x[1] != None]),len([1 for x in self.anim_seeds if x[2] != None]))/float(columns))
@@ -366,6 +101,7 @@ class Board:
         else:
             center_text(s, big_font, "seeds:", BLACK, s.get_width()*0.5, seed_size*0.5+border_size)
 
+        layer = []
         if anim_timer < 0.5:
             for seed in self.anim_seeds:
                 if seed[1] == None:
@@ -373,7 +109,7 @@ class Board:
                 pos = [get_grid_width(seed_size, border, seed[1]%columns), 
                        get_grid_width(seed_size, border, seed[1]//columns+1)]
                 t = draw_tile(seed[0], seed_size)
-                s.blit(t, pos)
+                layer.append((t, pos))
         elif anim_timer < 1.0:
             for seed in self.anim_seeds:
                 if seed[1] == None:
@@ -399,94 +135,112 @@ class Board:
                     pos[1] -= seed_size*(scale_factor-1)*0.5
                     t = pg.transform.scale(t, (seed_size*scale_factor, seed_size*scale_factor))
                 
-                s.blit(t, pos)
+                layer.append((t, pos))
 
         elif self.game_over:
 
             for i, j in enumerate(self.all_seeds):
                 pos = [get_grid_width(seed_size, border, i%columns), 
                        get_grid_width(seed_size, border, i//columns+1)]
-                t = draw_tile(j, seed_size)
-                if j not in self.seeds:
-                    t.set_alpha(64)
-                s.blit(t, pos)
+                t = draw_tile(j, seed_size, None if j in self.seeds else 64)
+                layer.append((t, pos))
 
         else:
             for i, j in enumerate(self.seeds):
                 pos = [get_grid_width(seed_size, border, i%columns), 
                        get_grid_width(seed_size, border, i//columns+1)]
                 t = draw_tile(j, seed_size)
-                s.blit(t, pos)
-        
+                layer.append((t, pos))
+
+        draw_layer(s, layer)
         return s
     
-    def display(self, tile_size, border, anim_timer, preview=False):
+    # view is the part of the board to draw, in pixels of the whole board
+    # (all of it if None). anything outside it is skipped
+    def display(self, tile_size, border, anim_timer, preview=False, view=None):
 
-        if preview:
-            s = self.preview_board.display(tile_size, border, 1.0)
-            s.fill(pg.Color(15, 15, 15), special_flags=pg.BLEND_RGBA_ADD)
-            return s
+        board_rect = pg.Rect(0, 0, get_grid_width(tile_size, border, self.width), get_grid_width(tile_size, border, self.height))
+        view = board_rect if view == None else pg.Rect(view).clip(board_rect)
 
-        s = pg.Surface((get_grid_width(tile_size, border, self.width), 
-                        get_grid_width(tile_size, border, self.height)), pg.SRCALPHA)
-
-        s.fill(FG_COL)
-
-        # draw empty grid
-        for i in range(self.width):
-            for j in range(self.height):
-                pg.draw.rect(s, EMPTY_TILE_COL, (get_grid_width(tile_size, border, i), get_grid_width(tile_size, border, j), tile_size, tile_size))
+        if preview:
+            preview_board = self.preview_board
+            if preview_board.preview_surf == None or preview_board.preview_surf[:3] != (tile_size, border, tuple(view)):
+                s = preview_board.display(tile_size, border, 1.0, view=view).copy()
+                s.fill(pg.Color(15, 15, 15), special_flags=pg.BLEND_RGBA_ADD)
+                preview_board.preview_surf = (tile_size, border, tuple(view), s)
+            return preview_board.preview_surf[3]
+
+        # the cells that are at least partly in view
+        first_i = max(int((view.left-border)//(tile_size+border)), 0)
+        last_i = min(int(view.right//(tile_size+border)), self.width-1)
+        first_j = max(int((view.top-border)//(tile_size+border)), 0)
+        last_j = min(int(view.bottom//(tile_size+border)), self.height-1)
+
+        # everything gets drawn relative to the corner of the view
+        def cell_pos(i, j):
+            return [get_grid_width(tile_size, border, i)-view.left, get_grid_width(tile_size, border, j)-view.top]
+
+        def in_view(pos, size):
+            return pos[0] < view.width and pos[1] < view.height and pos[0]+size > 0 and pos[1]+size > 0
+
+        # draw on the same surface every frame, over the empty grid
+        global board_canvas
+        if board_canvas == None or board_canvas.get_size() != view.size:
+            board_canvas = pg.Surface(view.size, pg.SRCALPHA)
+        s = board_canvas
+        s.blit(get_empty_grid(self.width, self.height, tile_size, border, self.tainted, view), (0, 0))
+
+        # anim_tiles only has the lines that changed, everything else sits still
+        if anim_timer < 1.0:
+            anim_tiles = get_anim_tiles(self.anim_tiles, first_i, last_i, first_j, last_j)
+            animated_cells = {tile[2] for tile in anim_tiles}
+        else:
+            animated_cells = ()
+        layer = []
+        for i in range(first_i, last_i+1):
+            for j in range(first_j, last_j+1):
+                if self.tiles[i][j] == None or (i, j) in animated_cells:
+                    continue
+                blit_tile(s, self.tiles[i][j], tile_size, cell_pos(i, j), layer=layer)
+        draw_layer(s, layer)
 
-        if self.tainted:
-            for i in range(self.width+1):
-                for j in range(self.height+1):
-                    pg.draw.circle(s, BLACK, (get_grid_width(tile_size, border, i)-border_size*0.5, get_grid_width(tile_size, border, j)-border_size*0.5), border_size*0.5)
+        # moving tiles go on top
+        layer = []
 
-        
         # first half of animation
         if anim_timer < 0.5:
 
-            for tile in self.anim_tiles:
+            for tile in anim_tiles:
                 if tile[1] == None:
                     continue
                 # draw moving tiles
-                pos = [get_grid_width(tile_size, border, pg.math.lerp(tile[0][0],tile[2][0],anim_timer*2)), 
-                       get_grid_width(tile_size, border, pg.math.lerp(tile[0][1],tile[2][1],anim_timer*2))]
-                t = draw_tile(tile[1], tile_size)
-                s.blit(t, pos)
+                pos = [get_grid_width(tile_size, border, pg.math.lerp(tile[0][0],tile[2][0],anim_timer*2))-view.left, 
+                       get_grid_width(tile_size, border, pg.math.lerp(tile[0][1],tile[2][1],anim_timer*2))-view.top]
+                if in_view(pos, tile_size):
+                    blit_tile(s, tile[1], tile_size, pos, layer=layer)
 
         # second half of animation
         elif anim_timer < 1.0:
-            for tile in self.anim_tiles:
+            for tile in anim_tiles:
                 if tile[1] == None:
                     scale_factor = anim_timer*2-1
                 elif tile[1] != tile[3]:
                     scale_factor = -3.2*(anim_timer-1)*(anim_timer-0.5)+1
                 else:
                     scale_factor = 1.0
-                pos = [get_grid_width(tile_size, border, tile[2][0]), 
-                       get_grid_width(tile_size, border, tile[2][1])]
-                t = draw_tile(tile[3], tile_size)
+                pos = cell_pos(*tile[2])
+                if not in_view(pos, tile_size):
+                    continue
                 if scale_factor != 1:
                     pos[0] -= tile_size*(scale_factor-1)*0.5
                     pos[1] -= tile_size*(scale_factor-1)*0.5
-                    t = pg.transform.scale(t, (tile_size*scale_factor, tile_size*scale_factor))
-                s.blit(t, pos)
-        else:
-            # draw tiles normally
-            for i in range(self.width):
-                for j in range(self.height):
-                    if self.tiles[i][j] == None:
-                        continue
-                    pos = [get_grid_width(tile_size, border, i), 
-                           get_grid_width(tile_size, border, j)]
-                    t = draw_tile(self.tiles[i][j], tile_size) 
-                    s.blit(t, pos)
-
-            if self.game_over:
-                game_over_text = huge_font.render("game over.", 1, WHITE)
-                s.blit(game_over_text, ((s.get_width()-game_over_text.get_width())*0.5,(s.get_height()-game_over_text.get_height())*0.5))
-        
+                blit_tile(s, tile[3], tile_size, pos, scale_factor, layer)
+
+        elif self.game_over:
+            game_over_text = render_text(huge_font, "game over.", WHITE)
+            s.blit(game_over_text, ((s.get_width()-game_over_text.get_width())*0.5,(s.get_height()-game_over_text.get_height())*0.5))
+
+        draw_layer(s, layer)
         return s
 
 class Particle:
@@ -510,7 +264,7 @@ class Particle:
 
     def display(self, surf):
         real_size = (self.life/self.max_life)*self.size
-        pg.draw.circle(surf, self.col, self.pos, real_size)
+        return pg.draw.circle(surf, self.col, self.pos, real_size)
 
 class Button:
 
@@ -518,39 +272,26 @@ class Button:
 
         self.pos = pg.Rect(pos)
 
-        if img == None:
-            self.img = pg.transform.scale(button_off_sprite, self.pos.size)
-        else:
-            self.img = pg.transform.scale(img, self.pos.size)
-        if hover_img == None:
-            self.hover_img = pg.transform.scale(button_on_sprite, self.pos.size)
-        else:
-            self.hover_img = pg.transform.scale(hover_img, self.pos.size)
+        self.sprite = button_off_sprite if img == None else img
+        self.hover_sprite = button_on_sprite if hover_img == None else hover_img
 
+        self.text = None
         self.update_text(text)
 
     def display(self, surf, mouse_pos):
 
         if self.pos.collidepoint(mouse_pos):
-            sprite = self.hover_img.copy()
+            surf.blit(self.hover_img, self.pos.topleft)
         else:
-            sprite = self.img.copy()
-        
-        if self.text_img != None:
-            sprite.blit(self.text_img, ((sprite.get_width()-self.text_img.get_width())/2, (sprite.get_height()-self.text_img.get_height())/2))
-        
-        surf.blit(sprite, self.pos.topleft)
+            surf.blit(self.img, self.pos.topleft)
 
     def update_text(self, text):
 
-        if text != "":
-            self.text_img = huge_font.render(text, 1, BLACK)
-            if self.text_img.get_width() > self.pos.width-2*border_size:
-                self.text_img = big_font.render(text, 1, BLACK)
-            if self.text_img.get_width() > self.pos.width-2*border_size:
-                self.text_img = lil_font.render(text, 1, BLACK)
-        else:
-            self.text_img = None
+        if text == self.text:
+            return
+        self.text = text
+        self.img = get_button_face(self.sprite, self.pos.size, text)
+        self.hover_img = get_button_face(self.hover_sprite, self.pos.size, text)
 
     def collide(self, mouse_pos):
 
@@ -610,6 +351,8 @@ class Profile:
             self.stats["numseeds"] = 1
         if "gamesplayed" not in self.stats:
             self.stats["gamesplayed"] = 0
+        if "replays" not in self.stats:
+            self.stats["replays"] = []
         
     def has_default_settings(self):
         for i in self.default_settings:
@@ -625,6 +368,9 @@ class Profile:
             return
         
         self.stats["history"].append(self.board.score)
+        # boards from old profiles don't have their whole game logged, so they can't be replayed
+        if self.board.full_log:
+            self.stats["replays"].append(replay.game_log(self.board))
 
         # update highscore
         if self.board.score > self.stats["highscore"]:
@@ -785,52 +531,99 @@ def get_tile_col(tile):
     r = 0
     g = 0
     b = 0
+    powers = dict(primes.factorize(tile))
 
     # make tile redder for each 2,
-    while tile % 2 == 0:
-        tile //= 2
+    for i in range(powers.get(2, 0)):
         r = 102+r*0.6
     
     # greener for each 3,
-    while tile % 3 == 0:
-        tile //= 3
+    for i in range(powers.get(3, 0)):
         g = 102+g*0.6
 
     # and bluer for each 5.
-    while tile % 5 == 0:
-        tile //= 5
+    for i in range(powers.get(5, 0)):
         b = 102+b*0.6
 
     return pg.Color(int(r), int(g), int(b))
 
-# get the sprite of a tile
-# returns a surface with the sprite
-def get_tile_sprite(tile):
+# the sprite atlas: each of prime_sprites (and zero_sprite) scaled once to each size tiles
+# get drawn at, keyed by (prime or 0, size), and every tile sprite made out of them, keyed by
+# (the PRIMES in the tile with their powers, size). emptied by configure_ui, since sizes all change then
+SPRITE_SIZE = 212
+SPRITE_CACHE_SIZE = 1024
+sprite_layers = {}
+sprite_composites = {}
+
+# sizes are usually square, but can be a (width, height) too
+def sprite_dims(size):
+    return size if isinstance(size, tuple) else (size, size)
+
+# one of the atlas' layers: prime's sprite (zero_sprite for 0) at size
+def get_sprite_layer(prime, size):
+    if (prime, size) not in sprite_layers:
+        sprite = zero_sprite if prime == 0 else prime_sprites[PRIME_INDEX[prime]]
+        sprite_layers[(prime, size)] = sprite if size == SPRITE_SIZE else pg.transform.scale(sprite, sprite_dims(size))
+    return sprite_layers[(prime, size)]
+
+# get the sprite of a tile at size (x size)
+# returns a surface with the sprite. it's shared, so don't draw on it
+def get_tile_sprite(tile, size=SPRITE_SIZE):
 
     # zero tile has precomputed sprite to save processing power
     if tile == 0:
-        return zero_sprite
-    
-    s = pg.Surface((212, 212), pg.SRCALPHA)
+        return get_sprite_layer(0, size)
 
-    # strings, e.g. rocks
+    # strings, e.g. rocks, have nothing
     if isinstance(tile, str):
+        factors = ()
+    else:
+        factors = tuple((prime, power) for prime, power in primes.factorize(tile) if prime in PRIME_INDEX)
+
+    # tiles with the same PRIMES in them look the same
+    key = (factors, size)
+    if key not in sprite_composites:
+        if len(sprite_composites) >= SPRITE_CACHE_SIZE:
+            sprite_composites.clear()
+        s = pg.Surface(sprite_dims(size), pg.SRCALPHA)
+        for prime, power in factors:
+            for i in range(power):
+                s.blit(get_sprite_layer(prime, size), (0, 0))
+        sprite_composites[key] = s
+    return sprite_composites[key]
+
+# finished tiles from draw_tile, most recently used last, keyed by (tile, size, alpha).
+# the same few tiles get drawn every frame, and drawing one from scratch is slow.
+# emptied by configure_ui, since sizes all change then
+TILE_CACHE_SIZE = 512
+tile_cache = OrderedDict()
+tile_cache_stats = {"hits": 0, "misses": 0}
+
+# draw a tile, see-through if alpha is given.
+# returns a surface with the tile. it's shared, so don't draw on it
+def draw_tile(tile, size, alpha=None):
+    if tile == None:
+        return
+
+    key = (tile, size, alpha)
+    s = tile_cache.get(key)
+    if s != None:
+        tile_cache.move_to_end(key)
+        tile_cache_stats["hits"] += 1
         return s
-    
-    for i, j in enumerate(PRIMES):
-        while tile % j == 0:
-            s.blit(prime_sprites[i], (0, 0))
-            tile //= j
-        if tile == 1:
-            break
+    tile_cache_stats["misses"] += 1
+
+    s = render_tile(tile, size)
+    if alpha != None:
+        s.set_alpha(alpha)
+    tile_cache[key] = s
+    if len(tile_cache) > TILE_CACHE_SIZE:
+        tile_cache.popitem(last=False)
     return s
 
-# draw a tile.
-# returns a surface with the tile
-def draw_tile(tile, size):
-    if tile == None:
-        return
-    
+# draw a tile from scratch
+def render_tile(tile, size):
+
     # pick a font size to fit the tile
     if len(str(tile)) < size*0.05:
         font = huge_font
@@ -851,19 +644,18 @@ def draw_tile(tile, size):
     s = pg.Surface((size, size))
     tile_col = get_tile_col(tile)
     s.fill(tile_col)
-    tile_sprite = get_tile_sprite(tile)
-    s.blit(pg.transform.scale(tile_sprite, (size, size)), (0, 0))
+    s.blit(get_tile_sprite(tile, size), (0, 0))
     #if tile_col.r > 180 and tile_col.g > 180 and tile_col.b > 180:
     
     # shadow
     
     if isinstance(tile, str) or tile >= 0:
-        text = font.render(str(tile), 1, WHITE)
-        text_shadow = font.render(str(tile), 1, BLACK)
+        text = render_text(font, str(tile), WHITE)
+        text_shadow = render_text(font, str(tile), BLACK)
     else:
         # negative tiles get inverted text
-        text = font.render(str(tile), 1, BLACK)
-        text_shadow = font.render(str(tile), 1, WHITE)
+        text = render_text(font, str(tile), BLACK)
+        text_shadow = render_text(font, str(tile), WHITE)
 
     text_pos = ((size-text.get_width())//2, (size-text.get_height())//2)
     s.blit(text_shadow, (text_pos[0]-shadow_size, text_pos[1]))
@@ -878,15 +670,175 @@ def draw_tile(tile, size):
 
     return s
 
-# check if two tiles are mergeable
-def check_merge(tile1, tile2):
-    if tile1 == None or tile2 == None or tile1 == "rock" or tile2 == "rock":
-        return None
-    # two tiles are mergeable if one is a factor of the other
-    # or one of them is 0 i guess
-    if tile1 == 0 or tile2 == 0 or tile1 % tile2 == 0 or tile2 % tile1 == 0:
-        return tile1 + tile2
-    return None
+# draw a tile onto surf, scaled by scale_factor.
+# tiles too small to read are just a square of their colour
+def blit_tile(surf, tile, size, pos, scale_factor=1.0, layer=None):
+
+    if size < SMALL_TILE_SIZE:
+        pg.draw.rect(surf, get_tile_col(tile), (pos[0], pos[1], size*scale_factor, size*scale_factor))
+        return
+
+    t = draw_tile(tile, size)
+    if scale_factor != 1:
+        t = pg.transform.scale(t, (size*scale_factor, size*scale_factor))
+    if layer == None:
+        surf.blit(t, pos)
+    else:
+        layer.append((t, pos))
+
+# what buttons look like, from get_button_face, keyed by (sprite, size, text).
+# lots of buttons look the same, and a lot of them get their text changed every frame.
+# emptied by configure_ui, since sizes all change then
+BUTTON_CACHE_SIZE = 256
+button_faces = {}
+# sprites turned around for buttons, keyed by (sprite, angle)
+turned_sprites = {}
+
+# sprite turned angle degrees anticlockwise, shared between the buttons that use it
+def turned_sprite(sprite, angle):
+    if (sprite, angle) not in turned_sprites:
+        turned_sprites[(sprite, angle)] = pg.transform.rotate(sprite, angle)
+    return turned_sprites[(sprite, angle)]
+
+# a button's sprite scaled to size with text in the middle, in the biggest font it fits in.
+# returns a surface with the button. it's shared, so don't draw on it
+def get_button_face(sprite, size, text):
+
+    key = (sprite, tuple(size), text)
+    if key in button_faces:
+        return button_faces[key]
+    if len(button_faces) >= BUTTON_CACHE_SIZE:
+        button_faces.clear()
+
+    s = pg.transform.scale(sprite, size)
+    if text != "":
+        text_img = render_text(huge_font, text, BLACK)
+        if text_img.get_width() > size[0]-2*border_size:
+            text_img = render_text(big_font, text, BLACK)
+        if text_img.get_width() > size[0]-2*border_size:
+            text_img = render_text(lil_font, text, BLACK)
+        s.blit(text_img, ((s.get_width()-text_img.get_width())/2, (s.get_height()-text_img.get_height())/2))
+
+    button_faces[key] = s
+    return s
+
+# pygame-ce has fblits, a blits that skips working out what got drawn where
+HAS_FBLITS = hasattr(pg.Surface, "fblits")
+
+# draw a layer of (surface, pos) pairs, in order, so later ones go on top.
+# fblits draws it in one call where there is one. plain blits isn't any quicker than
+# a blit each (benchmarks/bench_blits.py), so everywhere else it's a blit each
+def draw_layer(surf, layer):
+
+    if HAS_FBLITS:
+        surf.fblits(layer)
+    else:
+        for tile, pos in layer:
+            surf.blit(tile, pos)
+
+# empty grids from get_empty_grid, keyed by (width, height, tile_size, border, tainted, view).
+# they only change with the board's size or the zoom (or a big board's scrolling).
+# emptied by configure_ui, since sizes all change then
+GRID_CACHE_SIZE = 16
+grid_cache = {}
+# the surface Board.display draws on, kept from frame to frame while the view stays the same size
+board_canvas = None
+
+# a board's anim_tiles sorted into the lines they slide along, so a frame of a big board only
+# looks at the ones that can be in view. tiles in a line never pass each other, so sorted by
+# where they start, the near and far ends of their paths are sorted too and a bisect finds them.
+# spawns don't slide and go on their own.
+# (anim_tiles, how many there were, horizontal, backwards, {line: (tiles, near ends, far ends)}, spawns),
+# made again whenever the board moves (or spawns)
+anim_index = None
+
+def get_anim_index(anim_tiles):
+
+    global anim_index
+    if anim_index != None and anim_index[0] is anim_tiles and anim_index[1] == len(anim_tiles):
+        return anim_index
+
+    # every tile in a move slides the same way
+    horizontal, backwards = True, False
+    for tile in anim_tiles:
+        if tile[1] != None and tile[0] != tile[2]:
+            horizontal = tile[0][1] == tile[2][1]
+            backwards = tile[2] > tile[0]
+            break
+    along, across = (0, 1) if horizontal else (1, 0)
+
+    lines = {}
+    spawns = []
+    for tile in anim_tiles:
+        if tile[1] == None:
+            spawns.append(tile)
+        else:
+            lines.setdefault(tile[0][across], []).append(tile)
+    for line, tiles in lines.items():
+        tiles.sort(key=lambda tile: tile[0][along])
+        lines[line] = (tiles, [min(tile[0][along], tile[2][along]) for tile in tiles],
+                       [max(tile[0][along], tile[2][along]) for tile in tiles])
+
+    anim_index = (anim_tiles, len(anim_tiles), horizontal, backwards, lines, spawns)
+    return anim_index
+
+# the anim_tiles whose paths go through cells first_i to last_i across and first_j to last_j down
+# (give or take a cell, for tiles that grow as they merge), in the same order as anim_tiles
+# so they overlap the same way
+def get_anim_tiles(anim_tiles, first_i, last_i, first_j, last_j):
+
+    anim_tiles, count, horizontal, backwards, lines, spawns = get_anim_index(anim_tiles)
+    if horizontal:
+        first_along, last_along, first_across, last_across = first_i, last_i, first_j, last_j
+    else:
+        first_along, last_along, first_across, last_across = first_j, last_j, first_i, last_i
+
+    found = []
+    for line in range(first_across-1, last_across+2):
+        if line in lines:
+            tiles, near, far = lines[line]
+            line_tiles = tiles[bisect_left(far, first_along-1):bisect_right(near, last_along+1)]
+            # moves towards the far end list each line from that end
+            if backwards:
+                line_tiles.reverse()
+            found += line_tiles
+    return found+spawns
+
+# the empty cells of a board and the borders between them (with dots where they cross on
+# tainted boards), for the part of it in view. see Board.display.
+# returns a surface with the grid. it's shared, so don't draw on it
+def get_empty_grid(width, height, tile_size, border, tainted, view):
+
+    key = (width, height, tile_size, border, tainted, tuple(view))
+    if key in grid_cache:
+        return grid_cache[key]
+    if len(grid_cache) >= GRID_CACHE_SIZE:
+        grid_cache.clear()
+
+    s = pg.Surface(view.size, pg.SRCALPHA)
+
+    # the cells that are at least partly in view
+    first_i = max(int((view.left-border)//(tile_size+border)), 0)
+    last_i = min(int(view.right//(tile_size+border)), width-1)
+    first_j = max(int((view.top-border)//(tile_size+border)), 0)
+    last_j = min(int(view.bottom//(tile_size+border)), height-1)
+
+    # all one colour, with the borders drawn back over it
+    # (a line at a time, not a cell at a time, there can be a lot of cells)
+    s.fill(EMPTY_TILE_COL)
+    for i in range(first_i, last_i+2):
+        s.fill(FG_COL, (get_grid_width(tile_size, border, i)-view.left-border, 0, border, view.height))
+    for j in range(first_j, last_j+2):
+        s.fill(FG_COL, (0, get_grid_width(tile_size, border, j)-view.top-border, view.width, border))
+
+    if tainted:
+        for i in range(first_i, last_i+2):
+            for j in range(first_j, last_j+2):
+                pos = (get_grid_width(tile_size, border, i)-view.left, get_grid_width(tile_size, border, j)-view.top)
+                pg.draw.circle(s, BLACK, (pos[0]-border*0.5, pos[1]-border*0.5), border*0.5)
+
+    grid_cache[key] = s
+    return s
 
 def update_particles(tdelta):
 
@@ -895,10 +847,10 @@ def update_particles(tdelta):
 
     Particle.particles = [p for p in Particle.particles if p.life > 0]
 
+# returns the rects the particles were drawn in
 def display_particles(surf):
 
-    for p in Particle.particles:
-        p.display(surf)
+    return [p.display(surf) for p in Particle.particles]
 
 def scatter_particles(pos, size, col, life, count, spread_min, spread_max):
     for i in range(count):
@@ -909,25 +861,40 @@ def scatter_particles(pos, size, col, life, count, spread_min, spread_max):
 def configure_ui(profile):
 
     board = profile.get_board()
-    global board_pos, seed_pos, score_pos, tile_size, border_size, seed_columns, seed_size, stats_columns, stats_rows, stats_size, stats_pos, button_size, arrow_size, buttons
+    tile_cache.clear()
+    sprite_layers.clear()
+    sprite_composites.clear()
+    grid_cache.clear()
+    button_faces.clear()
+    global board_pos, seed_pos, score_pos, tile_size, border_size, board_border, board_viewport, seed_columns, seed_size, stats_columns, stats_rows, stats_size, stats_pos, button_size, arrow_size, buttons
 
     border_size = int(min(8, DISPLAY_WIDTH/80, DISPLAY_HEIGHT/60))
     tile_size = (min(DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT*0.75)-border_size*(max(board.width, board.height)+1))/max(board.width, board.height)
     seed_columns = 4
     seed_size = (DISPLAY_WIDTH/4-border_size*(seed_columns+3))/seed_columns
 
+    # boards too big to fit get a window onto them instead, see board_view
+    board_viewport = tile_size < MIN_TILE_SIZE
+    if board_viewport:
+        board_width = min(DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT*0.75)
+        tile_size = MIN_TILE_SIZE*view_zoom
+        board_border = min(border_size, max(1, int(tile_size/8)))
+    else:
+        board_width = get_grid_width(tile_size, border_size, max(board.width, board.height))
+        board_border = border_size
+
     button_size = DISPLAY_HEIGHT/8-border_size
-    arrow_size = min((DISPLAY_HEIGHT-get_grid_width(tile_size, border_size, max(board.width, board.height))-border_size*3)*0.5, button_size)
+    arrow_size = min((DISPLAY_HEIGHT-board_width-border_size*3)*0.5, button_size)
 
     stats_columns = int(max((DISPLAY_WIDTH-button_size*2)//(80+border_size), 1))
     stats_rows = int(max((DISPLAY_HEIGHT-button_size*3)//(80+border_size), 1))
     stats_size = (DISPLAY_WIDTH-button_size*2-border_size*(stats_columns+1))/stats_columns
     stats_pos = (button_size, button_size)
 
-    board_pos = pg.Rect((DISPLAY_WIDTH-get_grid_width(tile_size, border_size, max(board.width, board.height)))*0.5, 
+    board_pos = pg.Rect((DISPLAY_WIDTH-board_width)*0.5, 
                         border_size, 
-                        get_grid_width(tile_size, border_size, max(board.width, board.height)), 
-                        get_grid_width(tile_size, border_size, max(board.width, board.height)))
+                        board_width, 
+                        board_width)
     
     seed_pos =  pg.Rect(board_pos.left-get_grid_width(seed_size, border_size, seed_columns)-border_size, 
                         border_size, 
@@ -946,26 +913,28 @@ def configure_ui(profile):
                         hover_img=button_arrow_on_sprite),
         "down": Button((board_pos.centerx-arrow_size*0.5, 
                         board_pos.bottom+border_size+arrow_size, arrow_size, arrow_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 270),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 270)),
+                        img=turned_sprite(button_arrow_off_sprite, 270),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 270)),
         "left": Button((board_pos.centerx-arrow_size*1.5, 
                         board_pos.bottom+border_size+arrow_size, arrow_size, arrow_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 180),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 180)),
+                        img=turned_sprite(button_arrow_off_sprite, 180),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 180)),
         "up": Button((board_pos.centerx-arrow_size*0.5, 
                         board_pos.bottom+border_size, arrow_size, arrow_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 90),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 90)),
+                        img=turned_sprite(button_arrow_off_sprite, 90),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 90)),
         "preview": Button((board_pos.centerx-arrow_size*1.5, 
                         board_pos.bottom+border_size, arrow_size, arrow_size)),
+        "hint": Button((board_pos.centerx+arrow_size*0.5, 
+                        board_pos.bottom+border_size, arrow_size, arrow_size)),
         "seed_up": Button((seed_pos.left, 
                         DISPLAY_HEIGHT-arrow_size-border_size, seed_pos.width*0.5, arrow_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 90),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 90)),
+                        img=turned_sprite(button_arrow_off_sprite, 90),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 90)),
         "seed_down": Button((seed_pos.centerx, 
                         DISPLAY_HEIGHT-arrow_size-border_size, seed_pos.width*0.5, arrow_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 270),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 270)),
+                        img=turned_sprite(button_arrow_off_sprite, 270),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 270)),
         "settings": Button((DISPLAY_WIDTH*0.75+border_size, 
                         get_grid_width(button_size, border_size, 1), min(DISPLAY_WIDTH*0.25-border_size*2, button_size*3), button_size),
                         text="settings"),
@@ -1010,8 +979,8 @@ def configure_ui(profile):
                         "create profile" if profile.name == "" else "save and logout"),
     }, "svalbard": {
         "svalbard_left": Button((0, button_size, button_size, button_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 180),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 180)),
+                        img=turned_sprite(button_arrow_off_sprite, 180),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 180)),
         "svalbard_right": Button((DISPLAY_WIDTH-button_size, button_size, button_size, button_size),
                         img=button_arrow_off_sprite,
                         hover_img=button_arrow_on_sprite),
@@ -1021,8 +990,8 @@ def configure_ui(profile):
                         text="back"),
     }, "history": {
         "history_left": Button((0, button_size, button_size, button_size),
-                        img=pg.transform.rotate(button_arrow_off_sprite, 180),
-                        hover_img=pg.transform.rotate(button_arrow_on_sprite, 180)),
+                        img=turned_sprite(button_arrow_off_sprite, 180),
+                        hover_img=turned_sprite(button_arrow_on_sprite, 180)),
         "history_right": Button((DISPLAY_WIDTH-button_size, button_size, button_size, button_size),
                         img=button_arrow_off_sprite,
                         hover_img=button_arrow_on_sprite),
@@ -1038,7 +1007,7 @@ def configure_ui(profile):
     }
 
     for i in range(5):
-        buttons["settings"][f"settings_left{i+1}"] = Button((border_size, button_size*(i+1), button_size, button_size), img=pg.transform.rotate(button_arrow_off_sprite, 180), hover_img=pg.transform.rotate(button_arrow_on_sprite, 180))
+        buttons["settings"][f"settings_left{i+1}"] = Button((border_size, button_size*(i+1), button_size, button_size), img=turned_sprite(button_arrow_off_sprite, 180), hover_img=turned_sprite(button_arrow_on_sprite, 180))
         buttons["settings"][f"settings_right{i+1}"] = Button((DISPLAY_WIDTH-button_size-border_size, button_size*(i+1), button_size, button_size), img=button_arrow_off_sprite, hover_img=button_arrow_on_sprite)
 
     for i in range(5):
@@ -1047,8 +1016,87 @@ def configure_ui(profile):
                                              DISPLAY_WIDTH*0.2, 
                                              button_size*2))
         
-def center_text(surf, font, text, col, x, y): # this was getting *so* annoying
+# the part of a board too big to fit that's on screen, in pixels of the whole board.
+# None if the board fits
+def board_view():
+
+    if not board_viewport:
+        return None
+
+    # don't go off the edges
+    width = get_grid_width(tile_size, board_border, board.width)
+    height = get_grid_width(tile_size, board_border, board.height)
+    view_offset.x = max(0, min(view_offset.x, width-board_pos.width))
+    view_offset.y = max(0, min(view_offset.y, height-board_pos.height))
+    return pg.Rect(view_offset.x, view_offset.y, board_pos.width, board_pos.height)
+
+# zoom a board that doesn't fit by factor, keeping whatever's under focus (a point on screen) there
+def zoom_board(factor, focus):
+
+    global view_zoom, tile_size, board_border
+    focus = Vector2(focus)-board_pos.topleft
+    cell = (view_offset+focus)/(tile_size+board_border)
+
+    view_zoom = max(MIN_ZOOM, min(view_zoom*factor, MAX_ZOOM))
+    tile_size = MIN_TILE_SIZE*view_zoom
+    board_border = min(border_size, max(1, int(tile_size/8)))
+    view_offset.update(cell*(tile_size+board_border)-focus)
+
+# have rect drawn again next frame, or the whole screen if it's None
+def mark_dirty(rect=None):
+
+    global full_redraw
+    if rect == None:
+        full_redraw = True
+    else:
+        dirty_rects.append(pg.Rect(rect))
+
+# rendered text, most recently used last, keyed by (font, text, colour).
+# most of what's on screen is the same few labels every frame
+TEXT_CACHE_SIZE = 256
+text_cache = OrderedDict()
+text_cache_stats = {"hits": 0, "misses": 0}
+
+# render text in font, antialiased.
+# returns a surface with the text. it's shared, so don't draw on it
+def render_text(font, text, col):
+
+    key = (font, text, tuple(col))
+    t = text_cache.get(key)
+    if t != None:
+        text_cache.move_to_end(key)
+        text_cache_stats["hits"] += 1
+        return t
+    text_cache_stats["misses"] += 1
+
     t = font.render(text, 1, col)
+    text_cache[key] = t
+    if len(text_cache) > TEXT_CACHE_SIZE:
+        text_cache.popitem(last=False)
+    return t
+
+# "hit rate of lookups" for one of the caches' stats
+def hit_rate(stats):
+    lookups = stats["hits"]+stats["misses"]
+    return f"{stats['hits']/max(lookups, 1):.1%} of {lookups}"
+
+# the caches' hit rates in the top left corner, returns the rect they were drawn in.
+# drawn with font.render, going through the text cache would count against it
+def display_debug(surf):
+    lines = [f"tiles: {hit_rate(tile_cache_stats)} ({len(tile_cache)}/{TILE_CACHE_SIZE})",
+             f"text: {hit_rate(text_cache_stats)} ({len(text_cache)}/{TEXT_CACHE_SIZE})",
+             f"sprites: {len(sprite_composites)}/{SPRITE_CACHE_SIZE}, grids: {len(grid_cache)}/{GRID_CACHE_SIZE}"]
+    texts = [mini_font.render(line, 1, BLACK) for line in lines]
+    rect = pg.Rect(0, 0, max(t.get_width() for t in texts)+border_size*2, sum(t.get_height() for t in texts)+border_size*2)
+    surf.fill(BG_COL, rect)
+    y = border_size
+    for t in texts:
+        surf.blit(t, (border_size, y))
+        y += t.get_height()
+    return rect
+
+def center_text(surf, font, text, col, x, y): # this was getting *so* annoying
+    t = render_text(font, text, col)
     surf.blit(t, (x-t.get_width()*0.5, y-t.get_height()*0.5))
 
 def load_profile(profile_name):
@@ -1094,6 +1142,9 @@ except:
 
 profile.init_data()
 board = profile.get_board()
+# how far in a board too big to fit is zoomed, and where it's scrolled to
+view_zoom = 1.0
+view_offset = Vector2(0, 0)
 configure_ui(profile)
 
 last_move = 0
@@ -1104,11 +1155,40 @@ just_moved = True
 preview_held = False
 previewing_move = None
 
+# the best move for the board, searched for in the background after every move
+# (in slices, so the game's frames don't wait on it)
+hints = hint.HintWorker()
+hint_shown = False
+debug_shown = False
+debug_rect = pg.Rect(0, 0, 0, 0)
+
+# the screen only gets drawn when something on it changes, and only the parts that changed
+# get sent to the display: dirty_rects, or all of it if full_redraw. see mark_dirty.
+# with nothing going on the loop sleeps until there's an event, or IDLE_WAIT ms go by
+# so hints that finish in the background still show up
+IDLE_WAIT = 100
+full_redraw = True
+dirty_rects = []
+particle_rects = []
+hovered_buttons = {}
+shown_hint = None
+idle = False
+
 menu = ""
 game_running = True
 while game_running:
     
-    for event in pg.event.get():
+    if idle:
+        events = [pg.event.wait(IDLE_WAIT)]+pg.event.get()
+    else:
+        events = pg.event.get()
+
+    for event in events:
+        # anything but the mouse just moving could change anything.
+        # hovering over svalbard and history tiles shows text, so that too
+        if event.type != pg.NOEVENT and (event.type != pg.MOUSEMOTION or any(event.buttons) or menu in ("svalbard", "history")):
+            mark_dirty()
+
         if event.type == pg.QUIT:
             if profile.name != "":
                 profile.save_to_file()
@@ -1117,6 +1197,8 @@ while game_running:
                     file.write("")
             game_running = False
         elif event.type == pg.KEYDOWN:
+            if event.key in KEYBINDS["debug"]:
+                debug_shown = not debug_shown
             if menu == "":
                 if event.key in KEYBINDS["right"]:
                     if preview_held:
@@ -1147,8 +1229,16 @@ while game_running:
                     board = profile.get_board()
                     configure_ui(profile)
                     just_moved = True
+                elif event.key in KEYBINDS["undo"]:
+                    just_moved = board.undo()
+                    previewing_move = None
+                elif event.key in KEYBINDS["redo"]:
+                    just_moved = board.redo()
+                    previewing_move = None
                 elif event.key in KEYBINDS["preview"] and profile.settings["preview"]:
                     preview_held = True
+                elif event.key in KEYBINDS["hint"]:
+                    hint_shown = not hint_shown
             elif menu == "profile" and profile.name == "":
                 if event.unicode in TYPABLE_CHARS:
                     entered_name = entered_name + event.unicode
@@ -1168,6 +1258,13 @@ while game_running:
                 if event.key in KEYBINDS["preview"] and profile.settings["preview"]:
                     preview_held = False
                     previewing_move = None
+        elif event.type == pg.MOUSEWHEEL and menu == "" and board_viewport:
+            if board_pos.collidepoint(pg.mouse.get_pos()):
+                zoom_board(1.25**event.y, pg.mouse.get_pos())
+        elif event.type == pg.MOUSEMOTION and menu == "" and board_viewport:
+            # drag big boards around with the right or middle mouse button
+            if event.buttons[1] or event.buttons[2]:
+                view_offset -= event.rel
         elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
             
             # awful button code
@@ -1192,6 +1289,9 @@ while game_running:
                         if seed_pos.y > border_size:
                             seed_pos.y = border_size
 
+                    elif b == "hint":
+                        hint_shown = not hint_shown
+
                     elif b == "preview":
                         if profile.settings["preview"]:
                             preview_held = not preview_held
@@ -1390,13 +1490,13 @@ while game_running:
                             if profile.settings["width"] > 1:
                                 profile.settings["width"] -= 1
                         elif b == "settings_right2":
-                            if profile.settings["width"] < 10:
+                            if profile.settings["width"] < MAX_BOARD_SIZE:
                                 profile.settings["width"] += 1
                         elif b == "settings_left3":
                             if profile.settings["height"] > 1:
                                 profile.settings["height"] -= 1
                         elif b == "settings_right3":
-                            if profile.settings["height"] < 10:
+                            if profile.settings["height"] < MAX_BOARD_SIZE:
                                 profile.settings["height"] += 1
                         elif b == "settings_left4":
                             profile.settings["preview"] = not profile.settings["preview"]
@@ -1430,6 +1530,9 @@ while game_running:
         last_move = pg.time.get_ticks()
         anim_stage = 0
         just_moved = False
+        # searched for whether it's shown or not, so it's ready the moment it's asked for.
+        # the search stops at its depth or time budget, so an idle game still leaves the cpu alone
+        hints.start(board)
 
     tdelta = clock.tick(FPS)
 
@@ -1440,6 +1543,27 @@ while game_running:
     else:
         anim_timer = 1.0
 
+    # buttons the mouse moved on or off of
+    hovered = {name: b.pos.copy() for name, b in buttons[menu].items() if b.collide(pg.mouse.get_pos())}
+    for name in hovered.keys() ^ hovered_buttons.keys():
+        mark_dirty(hovered[name] if name in hovered else hovered_buttons[name])
+    hovered_buttons = hovered
+
+    # the hint button and the hinted arrow, when the search gets further
+    hint_state = hints.get_hint() if hint_shown else None
+    if hint_state != shown_hint and menu == "":
+        for name in ["hint", "right", "down", "left", "up"]:
+            mark_dirty(buttons[""][name].pos)
+    shown_hint = hint_state
+
+    # the board moving, or particles flying around it
+    animating = menu == "" and (anim_stage < 2 or previewing_move != None or len(Particle.particles) > 0)
+
+    if not (full_redraw or dirty_rects or animating or particle_rects):
+        idle = True
+        continue
+    idle = False
+
     main_dis.fill(BG_COL)
 
     if menu != "":
@@ -1447,18 +1571,20 @@ while game_running:
             b.display(main_dis, pg.mouse.get_pos())
     
     if menu == "": # main game
-        board_surf = board.display(tile_size, border_size, anim_timer, previewing_move!=None)
-        main_dis.blit(board_surf, board_pos.topleft)
+        view = board_view()
+        board_surf = board.display(tile_size, board_border, anim_timer, previewing_move!=None, view)
+        board_rect = main_dis.blit(board_surf, board_pos.topleft)
+        view_corner = (0, 0) if view == None else view.topleft
 
         seed_list_surf = board.display_seed_list(seed_size, border_size, seed_columns, anim_timer, previewing_move!=None)
-        main_dis.blit(seed_list_surf, seed_pos.topleft)
+        seed_list_rect = main_dis.blit(seed_list_surf, seed_pos.topleft)
 
         if anim_timer < 0.5:
             score_surf = draw_tile(board.anim_score, button_size)
         else:
             score_surf = draw_tile(board.score, button_size)
         
-        main_dis.blit(score_surf, score_pos.topleft)
+        score_rect = main_dis.blit(score_surf, score_pos.topleft)
         center_text(main_dis, lil_font, "score", WHITE, score_pos.centerx, score_pos.top+border_size)
 
         if board.tainted:
@@ -1467,7 +1593,7 @@ while game_running:
             high_score_surf = draw_tile(max(board.anim_score, profile.stats["highscore"]), button_size)
         else:
             high_score_surf = draw_tile(max(board.score, profile.stats["highscore"]), button_size)
-        main_dis.blit(high_score_surf, (score_pos.right+border_size, score_pos.top))
+        high_score_rect = main_dis.blit(high_score_surf, (score_pos.right+border_size, score_pos.top))
         center_text(main_dis, lil_font, "best", WHITE, score_pos.centerx+score_pos.width+border_size, score_pos.top+border_size)
 
         if anim_stage == 0 and anim_timer > 0.5:
@@ -1475,15 +1601,24 @@ while game_running:
             if profile.settings["particles"]:
                 for i in board.anim_tiles:
                     if i[1] != i[3] and i[1] != None:
-                        scatter_particles((get_grid_width(tile_size, border_size, i[2][0])+tile_size*0.5+board_pos.x, 
-                                        get_grid_width(tile_size, border_size, i[2][1])+tile_size*0.5+board_pos.y), 
-                                        tile_size*0.15, get_tile_col(i[3]), 0.8, 12, tile_size*2.5, tile_size*2.5)
+                        pos = (get_grid_width(tile_size, board_border, i[2][0])+tile_size*0.5+board_pos.x-view_corner[0], 
+                               get_grid_width(tile_size, board_border, i[2][1])+tile_size*0.5+board_pos.y-view_corner[1])
+                        # merges scrolled off screen don't get any
+                        if board_pos.collidepoint(pos):
+                            scatter_particles(pos, tile_size*0.15, get_tile_col(i[3]), 0.8, 12, tile_size*2.5, tile_size*2.5)
                 for i in board.anim_seeds:
                     if i[2] == None:
                         scatter_particles((get_grid_width(seed_size, border_size, i[1]%seed_columns)+seed_size*0.5+seed_pos.x, 
                                         get_grid_width(seed_size, border_size, i[1]//seed_columns+1)+seed_size*0.5+seed_pos.y), 
                                         seed_size*0.3, get_tile_col(i[0]), 0.4, 12, seed_size*3, seed_size*3)
 
+        # everything that animates, until it's been drawn finished once
+        if anim_stage < 2:
+            for rect in [board_rect, seed_list_rect, score_rect, high_score_rect]:
+                mark_dirty(rect)
+            if anim_timer >= 1:
+                anim_stage = 2
+
         if profile.settings["particles"] and previewing_move != None and random.random() < 0.4:
             if previewing_move == "right":
                 direction = Vector2(1, 0)
@@ -1502,10 +1637,22 @@ while game_running:
         else:
             buttons[""]["preview"].update_text("move")
 
-        for b in buttons[menu].values():
-            b.display(main_dis, pg.mouse.get_pos())
+        # the hinted arrow lights up like it's being hovered
+        hint_move = None
+        if hint_shown and hints.too_big(board):
+            buttons[""]["hint"].update_text("n/a")
+        elif hint_shown:
+            hint_move, hint_depth = hints.get_hint()
+            buttons[""]["hint"].update_text("..." if hint_move == None else f"depth {hint_depth}")
+        else:
+            buttons[""]["hint"].update_text("hint")
+
+        for b in buttons[menu]:
+            if b == hint_move:
+                buttons[menu][b].display(main_dis, buttons[menu][b].pos.center)
+            else:
+                buttons[menu][b].display(main_dis, pg.mouse.get_pos())
     
-        display_particles(main_dis)
 
     elif menu == "settings": # settings menu
 
@@ -1531,7 +1678,7 @@ while game_running:
 
         for i in range(5):
             if selected_slot == i:
-                main_dis.blit(pg.transform.scale(get_tile_sprite(11), (DISPLAY_WIDTH*0.2, button_size*2)), (DISPLAY_WIDTH*0.2*i, button_size))
+                main_dis.blit(get_tile_sprite(11, (int(DISPLAY_WIDTH*0.2), int(button_size*2))), (DISPLAY_WIDTH*0.2*i, button_size))
             if save_files[i] == None:
                 center_text(main_dis, huge_font, "empty", BLACK, DISPLAY_WIDTH*0.2*(i+0.5), button_size*2)
             else:
@@ -1548,7 +1695,7 @@ while game_running:
                        ("unique seeds discovered:", profile.stats["numseeds"]),
                        ("highest seed discovered:", profile.stats["maxseed"])]
         for i, j in enumerate(stat_labels):
-            text = huge_font.render(j[0], 1, BLACK)
+            text = render_text(huge_font, j[0], BLACK)
             main_dis.blit(text, (button_size*2+border_size, (button_size+border_size)*(1.5+i)-text.get_height()*0.5))
             main_dis.blit(draw_tile((j[1]), button_size), (button_size*2+text.get_width()+border_size*2, (button_size+border_size)*(1+i)))
 
@@ -1559,26 +1706,31 @@ while game_running:
 
         start_index = (page-1)*stats_columns*stats_rows
         achieved = profile.stats["svalbard"].keys()
+        layer = []
+        hover_text = None
         for i in range(stats_rows):
             for j in range(stats_columns):
                 svalbard_tile = start_index+i*stats_columns+j
                 if svalbard_tile < 2:
                     continue
-                t = draw_tile(svalbard_tile, stats_size)
-                if svalbard_tile not in achieved:
-                    t.set_alpha(63)
+                t = draw_tile(svalbard_tile, stats_size, None if svalbard_tile in achieved else 63)
 
                 pos = (get_grid_width(stats_size, border_size, j)+stats_pos[0], get_grid_width(stats_size, border_size, i)+stats_pos[1])
-                main_dis.blit(t, pos)
+                layer.append((t, pos))
                 if pg.Rect(pos, (stats_size, stats_size)).collidepoint(pg.mouse.get_pos()):
                     times = 0 if svalbard_tile not in achieved else profile.stats["svalbard"][svalbard_tile]
-                    center_text(main_dis, huge_font, f"unlocked this seed in {times} game{"" if times == 1 else "s"}", BLACK, DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT-button_size*1.5)
+                    hover_text = f"unlocked this seed in {times} game{"" if times == 1 else "s"}"
+        draw_layer(main_dis, layer)
+        if hover_text != None:
+            center_text(main_dis, huge_font, hover_text, BLACK, DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT-button_size*1.5)
 
     elif menu == "history":
 
         center_text(main_dis, huge_font, f"game history (page {page})", BLACK, DISPLAY_WIDTH*0.5, button_size*0.5)
 
         start_index = len(profile.stats["history"])-((page-1)*stats_columns*stats_rows)-1
+        layer = []
+        hover_text = None
         for i in range(stats_rows):
             for j in range(stats_columns):
                 index = start_index-i*stats_columns-j
@@ -1587,9 +1739,12 @@ while game_running:
                 t = draw_tile(profile.stats["history"][index], stats_size)
                 pos = (get_grid_width(stats_size, border_size, j)+stats_pos[0], get_grid_width(stats_size, border_size, i)+stats_pos[1])
 
-                main_dis.blit(t, pos)
+                layer.append((t, pos))
                 if pg.Rect(pos, (stats_size, stats_size)).collidepoint(pg.mouse.get_pos()):
-                    center_text(main_dis, huge_font, f"game #{index+1}", BLACK, DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT-button_size*1.5)
+                    hover_text = f"game #{index+1}"
+        draw_layer(main_dis, layer)
+        if hover_text != None:
+            center_text(main_dis, huge_font, hover_text, BLACK, DISPLAY_WIDTH*0.5, DISPLAY_HEIGHT-button_size*1.5)
     
     elif menu == "charts":
 
@@ -1610,9 +1765,26 @@ while game_running:
         else:
             center_text(main_dis, huge_font, f"current profile: {profile.name}", BLACK, DISPLAY_WIDTH*0.5, button_size*1.5)
 
-    version_text = lil_font.render(VERSION, 1, BLACK)
+    # where the particles are now and where they were last frame
+    new_particle_rects = display_particles(main_dis) if menu == "" else []
+    for rect in particle_rects+new_particle_rects:
+        mark_dirty(rect)
+    particle_rects = new_particle_rects
+
+    version_text = render_text(lil_font, VERSION, BLACK)
     main_dis.blit(version_text, (DISPLAY_WIDTH-version_text.get_width()-border_size, DISPLAY_HEIGHT-version_text.get_height()-border_size))
 
-    pg.display.flip()
+    # the numbers change every frame and get shorter and longer, so where they were last frame too
+    if debug_shown:
+        new_debug_rect = display_debug(main_dis)
+        mark_dirty(new_debug_rect.union(debug_rect))
+        debug_rect = new_debug_rect
+
+    if full_redraw:
+        pg.display.flip()
+    else:
+        pg.display.update(dirty_rects)
+    full_redraw = False
+    dirty_rects = []
 
 pg.quit()
\ No newline at end of file
@@ -0,0 +1,4 @@
+# headless pydive: the game rules without the pygame front end.
+# keep this import light, simulation workers import it a lot.
+from pydive.engine import Board, check_merge
+from pydive.compact import CompactBoard
@@ -0,0 +1,133 @@
+# command line tools for the headless engine
+#   python -m pydive simulate --mode 1 --size 4x4 --games 100000 --workers 8 --policy greedy
+#   python -m pydive solve --mode 1 --size 4x4 --time 100
+#   python -m pydive tablebase --mode 1 --size 2x2 --out 2x2.tb
+import argparse
+import sys
+import time
+
+from pydive import engine, replay, simulate, solver, tablebase
+
+def parse_size(text):
+    try:
+        width, height = (int(x) for x in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size should look like 4x4, not {text}")
+    if width < 1 or height < 1:
+        raise argparse.ArgumentTypeError("boards need at least one row and column")
+    return width, height
+
+# the score a fraction of the way up a {score: count} distribution
+def percentile(distribution, games, fraction):
+    seen = 0
+    for score in sorted(distribution):
+        seen += distribution[score]
+        if seen >= games*fraction:
+            return score
+    return 0
+
+def print_summary(totals, file=sys.stdout):
+
+    games = totals["games"]
+    scores = totals["scores"]
+    if games == 0:
+        print("no games played", file=file)
+        return
+
+    print(f"games: {games}", file=file)
+    print(f"score: mean {sum(s*n for s, n in scores.items())/games:.1f}, best {max(scores)}, "
+          f"quartiles {percentile(scores, games, 0.25)} / {percentile(scores, games, 0.5)} / {percentile(scores, games, 0.75)}", file=file)
+    print(f"moves per game: mean {totals['moves']/games:.1f}, most {max(totals['moves_per_game'])}", file=file)
+    print(f"seeds found: {len(totals['svalbard'])}, biggest {max(totals['svalbard'], default=0)}", file=file)
+    print(f"svalbard: {dict(sorted(totals['svalbard'].items()))}", file=file)
+    print(f"scores: {dict(sorted(scores.items()))}", file=file)
+
+def run_simulate(args):
+
+    width, height = args.size
+    start = time.perf_counter()
+    totals = simulate.new_results()
+
+    # progress goes to stderr so stdout is just the results
+    for totals in simulate.results(args.mode, width, height, args.games, args.policy, args.workers,
+                                   args.seed, args.max_moves, args.chunk_size):
+        if not args.quiet:
+            elapsed = time.perf_counter()-start
+            best = max(totals["scores"])
+            mean = sum(s*n for s, n in totals["scores"].items())/totals["games"]
+            print(f"\r{totals['games']}/{args.games} games, mean score {mean:.1f}, best {best}, "
+                  f"{totals['games']/elapsed:.0f} games/s", end="", file=sys.stderr, flush=True)
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    print_summary(totals)
+
+# play one game with the solver, move by move
+def run_solve(args):
+
+    width, height = args.size
+    board = engine.Board(width, height, args.mode, args.seed)
+    board.setup()
+    search = solver.Solver(seed=args.seed)
+
+    start = time.perf_counter()
+    while not board.game_over:
+        move = search.best_move(board, args.time, args.depth)
+        if move == None:
+            break
+        board.step(move)
+        if not args.quiet:
+            print(f"move {len(board.move_log)}: {move} (depth {search.depth}), score {board.score}")
+    elapsed = time.perf_counter()-start
+
+    print(f"score: {board.score} in {len(board.move_log)} moves")
+    print(f"searched {search.nodes} nodes, {search.nodes/elapsed:.0f} nodes/s, table hit rate {search.hit_rate():.1%}")
+    print(f"replay: {replay.game_log(board)}")
+
+def run_tablebase(args):
+
+    width, height = args.size
+    start = time.perf_counter()
+    count = tablebase.build(width, height, args.mode, args.out, args.max_sum)
+    print(f"{count} positions in {time.perf_counter()-start:.1f}s, written to {args.out}")
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog="python -m pydive", description="pydive without the window")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sim = commands.add_parser("simulate", help="play lots of games and tally the results")
+    sim.add_argument("--mode", type=int, default=1, choices=[0, 1, 2, 3])
+    sim.add_argument("--size", type=parse_size, default=(4, 4), help="WIDTHxHEIGHT, default 4x4")
+    sim.add_argument("--games", type=int, default=1000)
+    sim.add_argument("--workers", type=int, default=None, help="processes to use, default one per core")
+    sim.add_argument("--policy", default="random", choices=sorted(simulate.POLICIES))
+    sim.add_argument("--seed", type=int, default=None, help="makes the whole run repeatable")
+    sim.add_argument("--max-moves", type=int, default=None, help="stop games that go on longer than this")
+    sim.add_argument("--chunk-size", type=int, default=simulate.CHUNK_SIZE, help="games per work unit")
+    sim.add_argument("--quiet", action="store_true", help="don't show progress")
+
+    solve = commands.add_parser("solve", help="watch the solver play a game")
+    solve.add_argument("--mode", type=int, default=1, choices=[0, 1, 2, 3])
+    solve.add_argument("--size", type=parse_size, default=(4, 4), help="WIDTHxHEIGHT, default 4x4")
+    solve.add_argument("--time", type=float, default=100, help="milliseconds to think per move")
+    solve.add_argument("--depth", type=int, default=None, help="don't search deeper than this")
+    solve.add_argument("--seed", type=int, default=None, help="the game's seed, for replays")
+    solve.add_argument("--quiet", action="store_true", help="only show the result")
+
+    table = commands.add_parser("tablebase", help="work out every position of a small board exactly")
+    table.add_argument("--mode", type=int, default=1, choices=[0, 1, 2, 3])
+    table.add_argument("--size", type=parse_size, default=(2, 2), help="WIDTHxHEIGHT, default 2x2")
+    table.add_argument("--max-sum", type=int, default=None, help="stop at this tile sum, default depends on the size")
+    table.add_argument("--out", required=True, help="file to write")
+
+    args = parser.parse_args(argv)
+    if args.command == "simulate":
+        run_simulate(args)
+    elif args.command == "solve":
+        run_solve(args)
+    elif args.command == "tablebase":
+        run_tablebase(args)
+
+if __name__ == "__main__":
+    main()
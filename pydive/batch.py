@@ -0,0 +1,305 @@
+# a whole stack of boards moved at once with numpy.
+# same rules as engine.Board.move, but one call moves every board,
+# which is what monte carlo runs over thousands of games want.
+# needs numpy (the engine itself doesn't).
+import numpy as np
+
+from pydive import engine
+
+# cell values that aren't tiles
+EMPTY = np.iinfo(np.int64).min
+ROCK = EMPTY+1
+
+DIRECTIONS = engine.DIRECTIONS
+
+class BatchBoard:
+
+    def __init__(self, count, width, height, mode=1, seed=None):
+
+        self.count = count
+        self.width = width
+        self.height = height
+        self.mode = mode
+
+        # tiles[n][x][y], same layout as Board.tiles
+        self.tiles = np.full((count, width, height), EMPTY, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.game_over = np.zeros(count, dtype=bool)
+
+        # seeds, padded out to the longest seed list
+        # seeds[n][:num_seeds[n]] is board n's self.seeds
+        self.seeds = np.zeros((count, 1), dtype=np.int64)
+        self.num_seeds = np.zeros(count, dtype=np.int64)
+        self.all_seeds = [[] for i in range(count)]
+
+        self.rng = np.random.default_rng(seed)
+
+        # find_new_seed results, keyed by (tile, seeds)
+        self.seed_cache = {}
+
+    def setup(self):
+        starting_seeds = engine.STARTING_SEEDS.get(self.mode, [])
+        self.seeds = np.zeros((self.count, max(len(starting_seeds), 1)), dtype=np.int64)
+        self.seeds[:, :len(starting_seeds)] = starting_seeds
+        self.num_seeds[:] = len(starting_seeds)
+        self.all_seeds = [[x for x in starting_seeds] for i in range(self.count)]
+        self.spawn_tiles(np.arange(self.count), 2)
+
+    # stack up some existing boards
+    @classmethod
+    def from_boards(cls, boards, seed=None):
+
+        width, height, mode = boards[0].width, boards[0].height, boards[0].mode
+        batch = cls(len(boards), width, height, mode, seed)
+        batch.seeds = np.zeros((len(boards), max(max(len(b.seeds) for b in boards), 1)), dtype=np.int64)
+        for n, b in enumerate(boards):
+            if (b.width, b.height, b.mode) != (width, height, mode):
+                raise ValueError("all boards in a batch need the same size and mode")
+            for i in range(width):
+                for j in range(height):
+                    tile = b.tiles[i][j]
+                    batch.tiles[n, i, j] = EMPTY if tile == None else ROCK if tile == "rock" else tile
+            batch.score[n] = b.score
+            batch.game_over[n] = b.game_over
+            batch.seeds[n, :len(b.seeds)] = b.seeds
+            batch.num_seeds[n] = len(b.seeds)
+            batch.all_seeds[n] = [x for x in b.all_seeds]
+        return batch
+
+    # pull a single board back out, e.g. to look at it or draw it
+    def board(self, n, board_type=engine.Board):
+
+        b = board_type(self.width, self.height, self.mode)
+        b.tiles = [[None if x == EMPTY else "rock" if x == ROCK else int(x) for x in col] for col in self.tiles[n]]
+        b.score = int(self.score[n])
+        b.anim_score = b.score
+        b.game_over = bool(self.game_over[n])
+        b.seeds = [int(x) for x in self.seeds[n, :self.num_seeds[n]]]
+        b.all_seeds = [x for x in self.all_seeds[n]]
+        b.reindex()
+        return b
+
+    # perform one full move on every board
+    # directions is either one direction for all boards or a direction per board
+    # returns a bool array of which boards actually moved
+    def move(self, directions):
+
+        if isinstance(directions, str):
+            directions = [directions]*self.count
+
+        moved = np.zeros(self.count, dtype=bool)
+        merges = []
+
+        directions = np.asarray(directions)
+        for direction in DIRECTIONS:
+            boards = np.nonzero((directions == direction) & ~self.game_over)[0]
+            if len(boards) == 0:
+                continue
+            merges.append(self.slide_and_merge_tiles(boards, direction, moved))
+
+        boards = np.nonzero(moved)[0]
+        if len(boards) == 0:
+            return moved
+
+        # do seed math
+        if self.mode == 0 or self.mode == 1 or self.mode == 2:
+            merged = np.concatenate([m[0] for m in merges])
+            self.add_new_seeds(merged, np.concatenate([m[1] for m in merges]))
+
+            # remove old seeds
+            # (only merges take tiles away, so only boards that merged can lose seeds)
+            if self.mode == 0 or self.mode == 1:
+                self.remove_seeds(np.unique(merged))
+
+        # spawn a new tile
+        self.spawn_tiles(boards, 1)
+        self.check_for_game_over(boards)
+        for n in boards[self.game_over[boards]]:
+            self.all_seeds[n].sort()
+
+        return moved
+
+    # slide every line of the given boards towards the front, merging where possible
+    # fills in moved for those boards
+    # returns (board, new tile) arrays of every merge
+    def slide_and_merge_tiles(self, boards, direction, moved):
+
+        # view the boards as (board, line, position) with position 0 at the front
+        tiles = self.tiles[boards]
+        if direction == "left" or direction == "right":
+            lines = tiles.transpose(0, 2, 1)
+        else:
+            lines = tiles
+        if direction == "right" or direction == "down":
+            lines = lines[:, :, ::-1]
+        lines_per_board = lines.shape[1]
+        length = lines.shape[2]
+        lines = lines.reshape(-1, length)
+
+        count = len(lines)
+        rows = np.arange(count)
+        out = np.full((count, length), EMPTY, dtype=np.int64)
+
+        # where the next tile lands if it doesn't merge,
+        # and whether the tile in front of that spot is done merging (or a rock)
+        landing = np.zeros(count, dtype=np.int64)
+        blocked = np.ones(count, dtype=bool)
+        line_moved = np.zeros(count, dtype=bool)
+        score = np.zeros(count, dtype=np.int64)
+        merges = []
+        new_tiles = []
+
+        for k in range(length):
+            tile = lines[:, k]
+
+            # rocks don't move, and nothing merges with them
+            rock = tile == ROCK
+            out[rock, k] = ROCK
+            landing[rock] = k+1
+            blocked[rock] = True
+
+            # the tile in front of where this one lands
+            is_tile = (tile != EMPTY) & ~rock
+            front = out[rows, np.maximum(landing-1, 0)]
+            m = rows[is_tile & ~blocked]
+            m = m[mergeable(front[m], tile[m])]
+            merge = np.zeros(count, dtype=bool)
+            merge[m] = True
+
+            out[m, landing[m]-1] = front[m]+tile[m]
+            score[m] += np.minimum(front[m], tile[m])
+            blocked[m] = True
+            merges.append(m)
+            new_tiles.append(front[m]+tile[m])
+
+            # everything else just slides
+            s = rows[is_tile & ~merge]
+            out[s, landing[s]] = tile[s]
+            line_moved[s] |= landing[s] != k
+            blocked[s] = False
+            landing[s] += 1
+
+            line_moved[m] = True
+
+        # put the lines back the way they came
+        out = out.reshape(-1, lines_per_board, length)
+        if direction == "right" or direction == "down":
+            out = out[:, :, ::-1]
+        if direction == "left" or direction == "right":
+            out = out.transpose(0, 2, 1)
+        board_moved = line_moved.reshape(-1, lines_per_board).any(axis=1)
+
+        changed = boards[board_moved]
+        self.tiles[changed] = out[board_moved]
+        self.score[boards] += score.reshape(-1, lines_per_board).sum(axis=1)
+        moved[changed] = True
+
+        return boards[np.concatenate(merges)//lines_per_board], np.concatenate(new_tiles)
+
+    # boards[i] just merged new_tiles[i]
+    def add_new_seeds(self, boards, new_tiles):
+
+        # most new tiles are just products of seeds. dividing out each seed as
+        # often as it goes proves that for all of them at once,
+        # engine.find_new_seed gets the rest.
+        seeds = self.seeds[boards]
+        live = np.arange(seeds.shape[1]) < self.num_seeds[boards][:, None]
+        rest = np.abs(new_tiles)
+        active = np.nonzero(rest > 1)[0]
+        for i in range(seeds.shape[1]):
+            divisible = active[live[active, i]]
+            while len(divisible) > 0:
+                divisible = divisible[rest[divisible] % seeds[divisible, i] == 0]
+                rest[divisible] //= seeds[divisible, i]
+            active = active[rest[active] > 1]
+
+        if len(self.seed_cache) > 100000:
+            self.seed_cache.clear()
+        found = {}
+        unsure = (rest != 1) & (new_tiles != 0)
+        for n, tile in set(zip(boards[unsure].tolist(), new_tiles[unsure].tolist())):
+            board_seeds = tuple(self.seeds[n, :self.num_seeds[n]].tolist())
+            if (tile, board_seeds) not in self.seed_cache:
+                self.seed_cache[(tile, board_seeds)] = engine.find_new_seed(tile, board_seeds)
+            new_seed = self.seed_cache[(tile, board_seeds)]
+            if new_seed != None:
+                found.setdefault(n, set()).add(new_seed)
+
+        for n in found:
+
+            # find and add new seeds
+            new_seeds = sorted(found[n])
+
+            if self.num_seeds[n]+len(new_seeds) > self.seeds.shape[1]:
+                padding = np.zeros((self.count, self.num_seeds[n]+len(new_seeds)-self.seeds.shape[1]), dtype=np.int64)
+                self.seeds = np.concatenate((self.seeds, padding), axis=1)
+            self.seeds[n, self.num_seeds[n]:self.num_seeds[n]+len(new_seeds)] = new_seeds
+            self.num_seeds[n] += len(new_seeds)
+
+            for seed in new_seeds:
+                if seed not in self.all_seeds[n]:
+                    self.all_seeds[n].append(seed)
+
+    # remove seeds that don't divide any tile, scoring each one
+    def remove_seeds(self, boards):
+
+        if len(boards) == 0:
+            return
+        seeds = self.seeds[boards, :self.num_seeds[boards].max()]
+        live = np.arange(seeds.shape[1]) < self.num_seeds[boards][:, None]
+        tiles = self.tiles[boards].reshape(len(boards), 1, -1)
+        is_tile = (tiles != EMPTY) & (tiles != ROCK)
+
+        divisor = np.where(live, seeds, 1)[:, :, None]
+        divides = is_tile & (np.where(is_tile, tiles, 0) % divisor == 0)
+        remove = live & ~divides.any(axis=2)
+        if not remove.any():
+            return
+
+        self.score[boards] += np.where(remove, seeds, 0).sum(axis=1)
+
+        # shuffle the kept seeds to the front, keeping their order
+        order = np.argsort(remove | ~live, axis=1, kind="stable")
+        self.seeds[boards, :seeds.shape[1]] = np.where(live & ~remove, seeds, 0)[np.arange(len(boards))[:, None], order]
+        self.num_seeds[boards] -= remove.sum(axis=1)
+
+    # spawn tiles in empty tiles of the given boards
+    def spawn_tiles(self, boards, count):
+
+        for n in range(count):
+            boards = boards[self.num_seeds[boards] > 0]
+            empty = (self.tiles[boards] == EMPTY).reshape(len(boards), -1)
+            free = empty.sum(axis=1)
+            boards, empty, free = boards[free > 0], empty[free > 0], free[free > 0]
+            if len(boards) == 0:
+                return
+
+            # pick the position-th empty cell
+            position = (self.rng.random(len(boards))*free).astype(np.int64)
+            cell = np.argmax(np.cumsum(empty, axis=1) > position[:, None], axis=1)
+            seed = (self.rng.random(len(boards))*self.num_seeds[boards]).astype(np.int64)
+
+            self.tiles[boards, cell//self.height, cell%self.height] = self.seeds[boards, seed]
+
+    def check_for_game_over(self, boards):
+
+        # if any tiles are empty, game is not over
+        boards = boards[~(self.tiles[boards] == EMPTY).any(axis=(1, 2))]
+        tiles = self.tiles[boards]
+
+        # if any two adjacent tiles are mergeable, game is not over
+        over = ~mergeable_pairs(tiles[:, :, :-1], tiles[:, :, 1:]).any(axis=(1, 2))
+        over &= ~mergeable_pairs(tiles[:, :-1, :], tiles[:, 1:, :]).any(axis=(1, 2))
+
+        self.game_over[boards] = over
+
+# check_merge for arrays of tiles, ignoring whether they're actually tiles
+def mergeable(tile1, tile2):
+    safe1 = np.where(tile1 == 0, 1, tile1)
+    safe2 = np.where(tile2 == 0, 1, tile2)
+    return (tile1 == 0) | (tile2 == 0) | (tile1 % safe2 == 0) | (tile2 % safe1 == 0)
+
+# check_merge for arrays of cells that might be empty or rocks
+def mergeable_pairs(cell1, cell2):
+    tiles = (cell1 != EMPTY) & (cell1 != ROCK) & (cell2 != EMPTY) & (cell2 != ROCK)
+    return tiles & mergeable(np.where(tiles, cell1, 1), np.where(tiles, cell2, 1))
@@ -0,0 +1,212 @@
+# a small board for search trees and simulations, where there are millions of them.
+# same rules as Board (both run engine.BaseBoard's move), but the cells are one flat
+# array of 64 bit ints and there's no animation, preview board or taint to carry around.
+from array import array
+from functools import lru_cache
+
+from pydive import engine
+
+# cell values that aren't tiles (same as pydive.batch)
+EMPTY = -2**63
+ROCK = EMPTY+1
+
+# so encoded cells hash the same as the tiles they stand for
+engine.ZOBRIST_ALIASES[EMPTY] = None
+engine.ZOBRIST_ALIASES[ROCK] = "rock"
+
+# engine.slide_line for encoded lines, cached separately so
+# a repeated line skips the decoding too
+def slide_cells(cells, backwards=False):
+    if len(cells) > engine.MAX_CACHED_LINE:
+        return _long_slide_cells(cells, backwards)
+    return _cached_slide_cells(cells, backwards)
+
+def _slide_cells(cells, backwards):
+
+    line = tuple(None if x == EMPTY else "rock" if x == ROCK else x for x in cells)
+    new_line, moves, merges, score = engine.slide_line(line, backwards)
+    new_cells = tuple(EMPTY if x == None else ROCK if x == "rock" else x for x in new_line)
+    return new_cells, moves, merges, score
+
+def cells_stats(cells):
+    if len(cells) > engine.MAX_CACHED_LINE:
+        return _long_cells_stats(cells)
+    return _cached_cells_stats(cells)
+
+def _cells_stats(cells):
+    return engine.line_stats(tuple(None if x == EMPTY else "rock" if x == ROCK else x for x in cells))
+
+_cached_slide_cells = lru_cache(maxsize=engine.LINE_CACHE_SIZE)(_slide_cells)
+_cached_cells_stats = lru_cache(maxsize=engine.LINE_CACHE_SIZE)(_cells_stats)
+_long_slide_cells = engine.LongLineCache(_slide_cells)
+_long_cells_stats = engine.LongLineCache(_cells_stats)
+
+class CompactBoard(engine.BaseBoard):
+
+    __slots__ = ("width", "height", "mode", "cells", "seeds", "all_seeds", "score", "game_over", "seed", "rng",
+                 "seed_counts", "row_stats", "column_stats", "empty_count", "merge_counts", "slide_counts",
+                 "free_cells", "free_slots", "zobrist", "lookahead_cache")
+
+    def __init__(self, width, height, mode=1, seed=None):
+
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.game_over = False
+
+        # tile (i, j) is cells[i*height+j]
+        # tiles have to fit in 64 bits, anything bigger raises OverflowError
+        self.cells = array("q", [EMPTY])*(width*height)
+
+        self.seeds = []
+        self.all_seeds = []
+
+        self.score = 0
+
+        # see engine.BaseBoard.get_rng
+        self.seed = seed
+        self.rng = None
+
+        self.seed_counts = {}
+        self.row_stats = [cells_stats((EMPTY,)*width)]*height
+        self.column_stats = [cells_stats((EMPTY,)*height)]*width
+        self.empty_count = width*height
+        self.merge_counts = [0, 0]
+        self.slide_counts = [0, 0, 0, 0]
+        self.free_cells = list(range(width*height))
+        self.free_slots = list(range(width*height))
+        self.zobrist = engine.mode_key(mode)
+        self.lookahead_cache = None
+
+    @classmethod
+    def from_board(cls, board):
+
+        compact = cls(board.width, board.height, board.mode, board.seed)
+        compact.rng = engine.fork_rng(board.rng)
+        for i in range(board.width):
+            for j in range(board.height):
+                compact.set_tile(i, j, board.get_tile(i, j))
+        compact.seeds = [x for x in board.seeds]
+        compact.all_seeds = [x for x in board.all_seeds]
+        compact.score = board.score
+        compact.game_over = board.game_over
+        compact.reindex()
+        compact.free_cells = board.free_cells[:]
+        compact.free_slots = board.free_slots[:]
+        return compact
+
+    def to_board(self, board_type=engine.Board):
+
+        board = board_type(self.width, self.height, self.mode, self.seed)
+        board.rng = engine.fork_rng(self.rng)
+        board.tiles = self.tiles
+        board.seeds = [x for x in self.seeds]
+        board.all_seeds = [x for x in self.all_seeds]
+        board.score = self.score
+        board.anim_score = self.score
+        board.game_over = self.game_over
+        board.reindex()
+        board.free_cells = self.free_cells[:]
+        board.free_slots = self.free_slots[:]
+        return board
+
+    def get_tile(self, i, j):
+        tile = self.cells[i*self.height+j]
+        if tile == EMPTY:
+            return None
+        if tile == ROCK:
+            return "rock"
+        return tile
+
+    def _put_tile(self, i, j, tile):
+        if tile == None:
+            tile = EMPTY
+        elif tile == "rock":
+            tile = ROCK
+        self.cells[i*self.height+j] = tile
+
+    # lines come straight out of cells, still encoded
+    slide_line = staticmethod(slide_cells)
+    line_stats = staticmethod(cells_stats)
+    empty_cell = EMPTY
+
+    def _get_rows(self):
+        return [tuple(self.cells[j::self.height]) for j in range(self.height)]
+
+    def _get_columns(self):
+        return [tuple(self.cells[i*self.height:(i+1)*self.height]) for i in range(self.width)]
+
+    def _get_row(self, j):
+        return tuple(self.cells[j::self.height])
+
+    def _get_column(self, i):
+        return tuple(self.cells[i*self.height:(i+1)*self.height])
+
+    def _set_row(self, j, cells):
+        self.cells[j::self.height] = array("q", cells)
+
+    def _set_column(self, i, cells):
+        self.cells[i*self.height:(i+1)*self.height] = array("q", cells)
+
+    # list-of-lists copy of the tiles, laid out like Board.tiles
+    @property
+    def tiles(self):
+        return [[self.get_tile(i, j) for j in range(self.height)] for i in range(self.width)]
+
+    def copy(self):
+
+        board = CompactBoard.__new__(CompactBoard)
+        board.width = self.width
+        board.height = self.height
+        board.mode = self.mode
+        board.cells = self.cells[:]
+        board.seeds = self.seeds[:]
+        board.all_seeds = self.all_seeds[:]
+        board.score = self.score
+        board.game_over = self.game_over
+        board.seed = self.seed
+        board.rng = None
+        board.seed_counts = self.seed_counts.copy()
+        board.row_stats = self.row_stats[:]
+        board.column_stats = self.column_stats[:]
+        board.empty_count = self.empty_count
+        board.merge_counts = self.merge_counts[:]
+        board.slide_counts = self.slide_counts[:]
+        board.free_cells = self.free_cells[:]
+        board.free_slots = self.free_slots[:]
+        board.zobrist = self.zobrist
+        board.lookahead_cache = None
+        return board
+
+    # two boards are the same position if they have the same tiles and seeds.
+    # the score and all_seeds are history, not position, so they don't count.
+    def __eq__(self, other):
+        if not isinstance(other, CompactBoard):
+            return NotImplemented
+        return (self.width == other.width and self.height == other.height and self.mode == other.mode
+                and self.cells == other.cells and self.seeds == other.seeds)
+
+    # the zobrist hash is kept up to date as the board changes, and it's the same
+    # in every process, so this is O(1) and safe to ship between workers.
+    # don't change a board while it's a key in something
+    def __hash__(self):
+        return self.zobrist
+
+    def __getstate__(self):
+        return (self.width, self.height, self.mode, self.cells.tobytes(), self.seeds, self.all_seeds, self.score, self.game_over,
+                self.seed, self.rng, self.free_cells)
+
+    def __setstate__(self, state):
+        self.width, self.height, self.mode, cells, self.seeds, self.all_seeds, self.score, self.game_over, self.seed, self.rng, free_cells = state
+        self.cells = array("q")
+        self.cells.frombytes(cells)
+        self.reindex()
+
+        # keep the spawn order, like engine.Board does
+        self.free_cells = free_cells
+        for slot, cell in enumerate(free_cells):
+            self.free_slots[cell] = slot
+
+    # real tiles are the only values above ROCK
+    def _count_divisible(self, seed):
+        return sum(1 for tile in self.cells if tile > ROCK and tile % seed == 0)
@@ -0,0 +1,1022 @@
+# the game rules, with no pygame in sight.
+# dive.py draws these; everything else (simulations, solvers) can just import them.
+import random
+from array import array
+from functools import lru_cache
+
+from pydive import primes
+
+DIRECTIONS = ["left", "right", "up", "down"]
+
+# how moves are written down in a move log
+MOVE_LETTERS = {"left": "L", "right": "R", "up": "U", "down": "D"}
+
+# the seeds each gamemode starts with
+STARTING_SEEDS = {0: [2], 1: [2], 2: [2], 3: [2,3,5,7]}
+
+# how many distinct lines slide_line remembers
+LINE_CACHE_SIZE = 2**16
+# and how long they can be. a full cache of lines off a 1000x1000 board would hold
+# tens of millions of tiles, so longer lines go in a LongLineCache instead
+MAX_CACHED_LINE = 32
+# how many cells the lines in a LongLineCache can add up to
+LONG_LINE_CACHE_CELLS = 2**18
+# and how many (tile, seeds) find_new_seed does
+SEED_CACHE_SIZE = 2**16
+
+# what apply_moves says about each move: flags, score gained, and where the seeds
+# it found start and end in the list of new seeds
+STEP_FIELDS = 4
+STEP_MOVED = 1
+STEP_GAME_OVER = 2
+
+# slide one row or column towards its front, merging where possible.
+# the front is index 0, or the last index if backwards
+# returns (new line, moves, merges, score)
+# each move is (start index, start tile, end index, end tile), one for every tile in the line.
+# each merge is (tile, tile it merged into, new tile).
+# lines repeat a lot (even on big boards), so the answers are cached.
+def slide_line(line, backwards=False):
+    if len(line) > MAX_CACHED_LINE:
+        return _long_slide_line(line, backwards)
+    return _cached_slide_line(line, backwards)
+
+def _slide_line(line, backwards):
+
+    new_line = [None]*len(line)
+    moves = []
+    merges = []
+    score = 0
+
+    if backwards:
+        order = range(len(line)-1, -1, -1)
+        step = -1
+    else:
+        order = range(len(line))
+        step = 1
+
+    # where the next tile ends up if it doesn't merge,
+    # and whether the tile in front of that already merged (merged tiles can't merge again)
+    landing = order[0] if len(line) > 0 else 0
+    front_merged = False
+
+    for k in order:
+
+        tile = line[k]
+
+        # don't care about empty tiles
+        if tile == None:
+            continue
+
+        # rocks don't move
+        if tile == "rock":
+            new_line[k] = tile
+            moves.append((k, tile, k, tile))
+            landing = k+step
+            front_merged = False
+            continue
+
+        # everything between here and landing is empty, so the tile slides up against
+        # whatever is in front of landing (or the wall)
+        if landing != order[0] and not front_merged:
+
+            # check if the tiles are mergeable
+            front = landing-step
+            new_tile = check_merge(tile, new_line[front])
+
+            if new_tile != None:
+
+                # add score
+                score += min(new_line[front], tile)
+
+                merges.append((tile, new_line[front], new_tile))
+                moves.append((k, tile, front, new_tile))
+                new_line[front] = new_tile
+                front_merged = True
+                continue
+
+        new_line[landing] = tile
+        moves.append((k, tile, landing, tile))
+        landing += step
+        front_merged = False
+
+    return tuple(new_line), tuple(moves), tuple(merges), score
+
+_cached_slide_line = lru_cache(maxsize=LINE_CACHE_SIZE)(_slide_line)
+
+# what one row or column adds to the game over / legal move counters
+# returns (empty cells, mergeable neighbours, tiles that can slide towards the front,
+# tiles that can slide towards the back)
+def line_stats(line):
+    if len(line) > MAX_CACHED_LINE:
+        return _long_line_stats(line)
+    return _cached_line_stats(line)
+
+def _line_stats(line):
+
+    empties = 0
+    merges = 0
+    front_slides = 0
+    back_slides = 0
+
+    for k, tile in enumerate(line):
+        if tile == None:
+            empties += 1
+        if k == 0:
+            continue
+        front = line[k-1]
+        if check_merge(front, tile) != None:
+            merges += 1
+        elif front == None and tile != None and tile != "rock":
+            front_slides += 1
+        elif tile == None and front != None and front != "rock":
+            back_slides += 1
+
+    return empties, merges, front_slides, back_slides
+
+_cached_line_stats = lru_cache(maxsize=LINE_CACHE_SIZE)(_line_stats)
+
+# a cache of function(line, ...) for lines longer than MAX_CACHED_LINE, bounded by
+# the cells in the lines it holds rather than how many lines. emptied when it's full
+class LongLineCache:
+
+    def __init__(self, function, max_cells=LONG_LINE_CACHE_CELLS):
+        self.function = function
+        self.max_cells = max_cells
+        self.table = {}
+        self.cells = 0
+
+    def __call__(self, line, *args):
+        key = (line,)+args
+        result = self.table.get(key)
+        if result == None:
+            result = self.function(line, *args)
+            if self.cells+len(line) > self.max_cells:
+                self.table.clear()
+                self.cells = 0
+            self.table[key] = result
+            self.cells += len(line)
+        return result
+
+    def clear(self):
+        self.table.clear()
+        self.cells = 0
+
+_long_slide_line = LongLineCache(_slide_line)
+_long_line_stats = LongLineCache(_line_stats)
+
+# zobrist hashing: a board's hash is the xor of a random-looking 64 bit key for every
+# (tile, cell) on it, plus one per seed and one for the mode, so a changed cell costs
+# two xors instead of a rehash.
+# keys are worked out from the tile and cell (not drawn from an rng), so every process agrees on them
+HASH_MASK = 2**64-1
+
+# tile -> its key, added the first time a tile shows up.
+# empty cells have a key of 0, so they don't count
+ZOBRIST_KEYS = {None: 0}
+
+# a key for each cell number (i*height+j), grown as bigger boards need more cells
+CELL_KEYS = []
+
+# other names for a tile, for boards that store cells encoded (see pydive.compact)
+ZOBRIST_ALIASES = {}
+
+# splitmix64's finalizer, which scrambles an int into a good 64 bit key
+def mix64(x):
+    x = (x+0x9E3779B97F4A7C15) & HASH_MASK
+    x = ((x ^ (x >> 30))*0xBF58476D1CE4E5B9) & HASH_MASK
+    x = ((x ^ (x >> 27))*0x94D049BB133111EB) & HASH_MASK
+    return x ^ (x >> 31)
+
+# numbers get mix64 of themselves (see tile_key), with a different salt for negative ones.
+# the salts only differ at the top, so numbers only clash with ones around 2**63,
+# which no game ever gets near. rocks get the key of one of those too
+TILE_SALT = 0x711E
+NEGATIVE_SALT = TILE_SALT ^ (1 << 63)
+ROCK_KEY = mix64((1 << 62) ^ 0x80C4)
+
+def tile_key(tile):
+    name = ZOBRIST_ALIASES.get(tile, tile)
+    if name in ZOBRIST_KEYS:
+        key = ZOBRIST_KEYS[name]
+    elif name == "rock":
+        key = ROCK_KEY
+    else:
+        # mixed from the number itself 64 bits at a time (not hash(), which gives -1 and -2
+        # the same hash), so tiles past 64 bits still get keys of their own
+        rest, salt = (name, TILE_SALT) if name >= 0 else (~name, NEGATIVE_SALT)
+        key = mix64((rest & HASH_MASK) ^ salt)
+        rest >>= 64
+        while rest != 0:
+            key = mix64(key ^ (rest & HASH_MASK))
+            rest >>= 64
+    ZOBRIST_KEYS[tile] = key
+    return key
+
+# tile and cell keys get combined with one multiply, which is plenty for a hash
+# and a lot cheaper than a key per (tile, cell)
+def zobrist_key(tile, cell):
+
+    key = ZOBRIST_KEYS.get(tile)
+    if key == None:
+        key = tile_key(tile)
+    if key == 0:
+        return 0
+
+    if cell >= len(CELL_KEYS):
+        CELL_KEYS.extend(mix64(n ^ 0xCE11) for n in range(len(CELL_KEYS), cell+1))
+    key = ((key ^ CELL_KEYS[cell])*0xD6E8FEB86659FD93) & HASH_MASK
+    return key ^ (key >> 32)
+
+# seeds and the mode get keys out of the way of the cells'
+def seed_key(seed):
+    return mix64(mix64(seed & HASH_MASK) ^ 0x5EED)
+
+def seeds_hash(seeds):
+    key = 0
+    for seed in seeds:
+        key ^= seed_key(seed)
+    return key
+
+def mode_key(mode):
+    return mix64(0x30DE ^ mode)
+
+# the rules of the game, shared by every kind of board.
+# subclasses decide how cells are stored by providing get_tile and _put_tile,
+# plus width, height, mode, seeds, all_seeds, score, game_over
+# and the bookkeeping attributes that reindex sets up.
+class BaseBoard:
+
+    __slots__ = ()
+
+    # whether move() fills in anim_tiles, anim_seeds and anim_score (unless told otherwise)
+    animated = False
+    # whether move() records itself in undo_stack and move_log
+    journaled = False
+
+    # slide and count one line of cells as _get_rows/_get_columns return them
+    slide_line = staticmethod(slide_line)
+    line_stats = staticmethod(line_stats)
+    # what an empty cell looks like in those lines
+    empty_cell = None
+
+    def get_tile(self, i, j):
+        raise NotImplementedError
+
+    # store a tile without any bookkeeping
+    def _put_tile(self, i, j, tile):
+        raise NotImplementedError
+
+    def set_tile(self, i, j, tile):
+        self.lookahead_cache = None
+        old_tile = self.get_tile(i, j)
+        if old_tile == None and tile != None:
+            self._fill_cell(i*self.height+j)
+        elif old_tile != None and tile == None:
+            self._free_cell(i*self.height+j)
+        self._count_tile(old_tile, -1)
+        self.zobrist ^= zobrist_key(old_tile, i*self.height+j) ^ zobrist_key(tile, i*self.height+j)
+        self._put_tile(i, j, tile)
+        self._count_tile(tile, 1)
+        self._restat_row(j, self._get_row(j))
+        self._restat_column(i, self._get_column(i))
+
+    # a new board with the same state, minus any animation
+    def copy(self):
+        raise NotImplementedError
+
+    def setup(self):
+        self.seeds = [x for x in STARTING_SEEDS.get(self.mode, [])]
+        self.all_seeds = [x for x in self.seeds]
+        self.reindex()
+        self.spawn_tiles(2, self.animated)
+
+    # rebuild the bookkeeping that follows the tiles around, so moves don't have to rescan the board.
+    # call this after changing tiles or seeds behind the board's back
+    def reindex(self):
+
+        self.lookahead_cache = None
+
+        # how many tiles each seed divides, for seeds that can be removed
+        self.seed_counts = {}
+        if self.mode == 0 or self.mode == 1:
+            for seed in self.seeds:
+                self.seed_counts[seed] = self._count_divisible(seed)
+
+        # line_stats for every row and column, and their totals:
+        # how many cells are empty,
+        # how many neighbouring pairs could merge (horizontal, vertical),
+        # and how many tiles have an empty cell next to them in each of DIRECTIONS
+        self.row_stats = [(0, 0, 0, 0)]*self.height
+        self.column_stats = [(0, 0, 0, 0)]*self.width
+        self.empty_count = 0
+        self.merge_counts = [0, 0]
+        self.slide_counts = [0, 0, 0, 0]
+        for j, line in enumerate(self._get_rows()):
+            self._restat_row(j, line)
+        for i, line in enumerate(self._get_columns()):
+            self._restat_column(i, line)
+
+        # the zobrist hash of the whole position
+        self.zobrist = mode_key(self.mode) ^ seeds_hash(self.seeds)
+        for i in range(self.width):
+            for j in range(self.height):
+                self.zobrist ^= zobrist_key(self.get_tile(i, j), i*self.height+j)
+
+        # the empty cells (as i*height+j), in no particular order,
+        # and where each one is in free_cells (-1 for cells that aren't empty)
+        self.free_cells = []
+        self.free_slots = [-1]*(self.width*self.height)
+        for i in range(self.width):
+            for j in range(self.height):
+                if self.get_tile(i, j) == None:
+                    self._free_cell(i*self.height+j)
+
+    # how many tiles on the board are multiples of seed
+    def _count_divisible(self, seed):
+        count = 0
+        for i in range(self.width):
+            for j in range(self.height):
+                tile = self.get_tile(i, j)
+                if tile != None and tile != "rock" and tile % seed == 0:
+                    count += 1
+        return count
+
+    # swap the counters over to the new contents of row j.
+    # empty cells are counted along the rows only, so they aren't counted twice
+    def _restat_row(self, j, line):
+        old = self.row_stats[j]
+        new = self.line_stats(line)
+        if new is old:
+            return
+        self.row_stats[j] = new
+        self.empty_count += new[0]-old[0]
+        self.merge_counts[0] += new[1]-old[1]
+        self.slide_counts[0] += new[2]-old[2]
+        self.slide_counts[1] += new[3]-old[3]
+
+    def _restat_column(self, i, line):
+        old = self.column_stats[i]
+        new = self.line_stats(line)
+        if new is old:
+            return
+        self.column_stats[i] = new
+        self.merge_counts[1] += new[1]-old[1]
+        self.slide_counts[2] += new[2]-old[2]
+        self.slide_counts[3] += new[3]-old[3]
+
+    def _free_cell(self, cell):
+        self.free_slots[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    # swap the last free cell into this one's place, so nothing has to shift down
+    def _fill_cell(self, cell):
+        slot = self.free_slots[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[slot] = last
+            self.free_slots[last] = slot
+        self.free_slots[cell] = -1
+
+    # the directions that would move something, without trying them
+    def legal_moves(self):
+        if self.game_over:
+            return []
+        return [d for n, d in enumerate(DIRECTIONS) if self.slide_counts[n] > 0 or self.merge_counts[n//2] > 0]
+
+    # a tile appeared on (change = 1) or left (change = -1) the board
+    def _count_tile(self, tile, change):
+        if tile == None or tile == "rock":
+            return
+        for seed in self.seed_counts:
+            if tile % seed == 0:
+                self.seed_counts[seed] += change
+
+    # check if a new tile unlocks any seeds
+    # returns the new seed, or None if there is no new seed
+    def check_for_new_seed(self, new_tile):
+        return find_new_seed(new_tile, self.seeds)
+    
+    # remove seeds that don't divide any tile
+    def remove_seeds(self):
+
+        removed_seeds = []
+        for seed in self.seeds:
+            if self.seed_counts[seed] == 0:
+                # Score for removing a seed
+                self.score += seed
+                removed_seeds.append(seed)
+                del self.seed_counts[seed]
+        
+        self.seeds = [i for i in self.seeds if i not in removed_seeds]
+
+    # check whether 
+    def check_for_game_over(self):
+
+        # if any tiles are empty, game is not over
+        if self.empty_count > 0:
+            return
+                
+        # if any two adjacent tiles are mergeable, game is not over
+        if self.merge_counts[0] > 0 or self.merge_counts[1] > 0:
+            return
+        
+        self.game_over = True
+    
+    # spawn tiles in empty tiles, adding them to anim_tiles if record_anim is set
+    def spawn_tiles(self, count, record_anim=False):
+
+        if len(self.seeds) == 0:
+            return []
+
+        # add tiles randomly from the list of seeds
+        # (set_tile takes each one out of free_cells)
+        spawned = []
+        rng = self.get_rng()
+        for n in range(min(len(self.free_cells), count)):
+
+            cell = rng.choice(self.free_cells)
+            position = divmod(cell, self.height)
+            tile = rng.choice(self.seeds)
+
+            if record_anim:
+                self.anim_tiles.append((position, None, position, tile))
+            self.set_tile(position[0], position[1], tile)
+            spawned.append((cell, tile))
+
+        return spawned
+
+    # the board's own random numbers, so games can be replayed from their seed
+    # and boards in different threads don't share a stream.
+    # made the first time something spawns. copies get their own, started from the seed
+    # again, so nothing they spawn changes what the original does (see fork_rng too)
+    def get_rng(self):
+        if self.rng == None:
+            if self.seed == None:
+                self.seed = random.getrandbits(64)
+            self.rng = random.Random(self.seed)
+        return self.rng
+
+    # rows and columns as slide_line takes them
+    # (for Board those are just the tiles, other boards might encode them)
+
+    # every row, each left to right
+    def _get_rows(self):
+        return [tuple(self.get_tile(i, j) for i in range(self.width)) for j in range(self.height)]
+
+    # every column, each top to bottom
+    def _get_columns(self):
+        return [tuple(self.get_tile(i, j) for j in range(self.height)) for i in range(self.width)]
+
+    def _get_row(self, j):
+        return tuple(self.get_tile(i, j) for i in range(self.width))
+
+    def _get_column(self, i):
+        return tuple(self.get_tile(i, j) for j in range(self.height))
+
+    def _set_row(self, j, tiles):
+        for i, tile in enumerate(tiles):
+            self.set_tile(i, j, tile)
+
+    def _set_column(self, i, tiles):
+        for j, tile in enumerate(tiles):
+            self.set_tile(i, j, tile)
+
+    # slide all tiles in a single direction, merging where possible
+    # every cell that changes goes in changed_cells (if given) as (i*height+j, old tile, new tile),
+    # and every tile that slides goes in anim_tiles if record_anim is set
+    # returns list of all newly merged tiles
+    def slide_and_merge_tiles(self, dx, dy, changed_cells=None, record_anim=False):
+
+        # every row (or column) slides on its own
+        horizontal = dx != 0
+        backwards = dx > 0 or dy > 0
+        if horizontal:
+            stats, get_line, set_line = self.row_stats, self._get_row, self._set_row
+            restat_line, restat_cross, get_cross = self._restat_row, self._restat_column, self._get_column
+        else:
+            stats, get_line, set_line = self.column_stats, self._get_column, self._set_column
+            restat_line, restat_cross, get_cross = self._restat_column, self._restat_row, self._get_row
+
+        # a line only changes if something in it can slide this way or merge,
+        # which its stats already say, so the rest aren't even looked at
+        slides = 3 if backwards else 2
+        lines = [(n, get_line(n)) for n, line_stats in enumerate(stats) if line_stats[1] > 0 or line_stats[slides] > 0]
+
+        # the lines across this way that went through a changed cell
+        crossed = set()
+
+        new_tiles = []
+        move_worked = False
+        for n, line in lines:
+
+            new_line, moves, merges, score = self.slide_line(line, backwards)
+
+            if new_line != line:
+                set_line(n, new_line)
+                restat_line(n, new_line)
+                for k in range(len(line)):
+                    if line[k] != new_line[k]:
+                        crossed.add(k)
+                        cell = k*self.height+n if horizontal else n*self.height+k
+                        self.zobrist ^= zobrist_key(line[k], cell) ^ zobrist_key(new_line[k], cell)
+                        if changed_cells != None:
+                            changed_cells.append((cell, line[k], new_line[k]))
+                        if line[k] == self.empty_cell:
+                            self._fill_cell(cell)
+                        elif new_line[k] == self.empty_cell:
+                            self._free_cell(cell)
+
+                self.score += score
+                move_worked = True
+
+                for tile, other, new_tile in merges:
+                    new_tiles.append(new_tile)
+                    self._count_tile(tile, -1)
+                    self._count_tile(other, -1)
+                    self._count_tile(new_tile, 1)
+
+            # add animation
+            if record_anim:
+                if horizontal:
+                    self.anim_tiles += [((start, n), start_tile, (end, n), end_tile) for start, start_tile, end, end_tile in moves]
+                else:
+                    self.anim_tiles += [((n, start), start_tile, (n, end), end_tile) for start, start_tile, end, end_tile in moves]
+
+        for k in crossed:
+            restat_cross(k, get_cross(k))
+
+        return new_tiles if move_worked else None
+    
+    # what each of DIRECTIONS would do, with no tile spawned:
+    # {direction: board after the move, or None if the move does nothing}
+    # worked out once per position and kept until the board changes,
+    # so the boards are shared. don't change them
+    def lookahead(self):
+
+        if self.lookahead_cache == None:
+            legal_moves = self.legal_moves()
+            self.lookahead_cache = {}
+            for direction in DIRECTIONS:
+                if direction in legal_moves:
+                    board = self.copy()
+                    board.move(direction, preview=True)
+                    self.lookahead_cache[direction] = board
+                else:
+                    self.lookahead_cache[direction] = None
+
+        return self.lookahead_cache
+
+    # returns a board with the move done, but no tile spawned
+    def preview_move(self, direction):
+
+        preview_board = self.lookahead().get(direction)
+        if preview_board == None:
+            preview_board = self.copy()
+        return preview_board
+
+    # perform one full move of the game, recording its animation if record_anim is set
+    # (the board's animated flag if it isn't given)
+    # returns whether or not the move was successful
+    def move(self, direction, preview=False, record_anim=None):
+
+        if self.game_over:
+            return False
+
+        if record_anim == None:
+            record_anim = self.animated
+        if record_anim:
+            self.anim_tiles = []
+            self.anim_score = self.score
+
+        # what the journal needs to take this move back
+        changed_cells = None
+        if self.journaled and not preview:
+            changed_cells = []
+            journal_score = self.score
+            journal_seeds = tuple(self.seeds)
+            journal_all_seeds = tuple(self.all_seeds)
+
+        if direction == "right":
+            new_tiles = self.slide_and_merge_tiles(1, 0, changed_cells, record_anim)
+        elif direction == "down":
+            new_tiles = self.slide_and_merge_tiles(0, 1, changed_cells, record_anim)
+        elif direction == "left":
+            new_tiles = self.slide_and_merge_tiles(-1, 0, changed_cells, record_anim)
+        elif direction == "up":
+            new_tiles = self.slide_and_merge_tiles(0, -1, changed_cells, record_anim)
+        else:
+            return False
+        
+        if new_tiles == None:
+            return False
+        self.lookahead_cache = None
+        
+        # do seed math
+        if self.mode == 0 or self.mode == 1 or self.mode == 2:
+
+            old_seeds = [x for x in self.seeds]
+
+            # find and add new seeds
+            new_seeds = list(set([self.check_for_new_seed(i) for i in new_tiles]))
+            if None in new_seeds:
+                new_seeds.remove(None)
+            new_seeds.sort()
+            self.seeds += new_seeds
+
+            # remove old seeds
+            if self.mode == 0 or self.mode == 1:
+
+                for seed in new_seeds:
+                    self.seed_counts[seed] = self._count_divisible(seed)
+                self.remove_seeds()
+
+            if self.seeds != old_seeds:
+                self.zobrist ^= seeds_hash(old_seeds) ^ seeds_hash(self.seeds)
+
+            # seed animation
+            if record_anim:
+                self.anim_seeds = []
+                for i, seed in enumerate(old_seeds):
+                    if seed in self.seeds:
+                        self.anim_seeds.append((seed, i, self.seeds.index(seed)))
+                    else:
+                        self.anim_seeds.append((seed, i, None))
+            
+            for i, seed in enumerate(self.seeds):
+                if seed not in self.all_seeds:
+                    self.all_seeds.append(seed)
+                if seed not in old_seeds and record_anim:
+                    self.anim_seeds.append((seed, None, i))
+        
+        elif record_anim:
+
+            self.anim_seeds = [(seed, i, i) for i, seed in enumerate(self.seeds)]
+
+        # spawn a new tile
+        if not preview:
+            spawned = self.spawn_tiles(1, record_anim)
+
+            self.check_for_game_over()
+            if self.game_over:
+                self.all_seeds.sort()
+
+            if changed_cells != None:
+                self.record_move(direction, changed_cells, spawned, journal_score, journal_seeds, journal_all_seeds)
+            
+        return True
+
+    # move() for when nothing is going to draw it: no anim_tiles or anim_seeds get made
+    # (whatever they held from before is left alone) unless record_anim is set.
+    # returns whether or not the move was successful
+    def step(self, direction, record_anim=False):
+        return self.move(direction, record_anim=record_anim and self.animated)
+
+    # add a move to the undo stack, see Board.undo for the format
+    def record_move(self, direction, changed_cells, spawned, old_score, old_seeds, old_all_seeds):
+
+        letter = MOVE_LETTERS[direction]
+        self.move_log.append(ord(letter))
+
+        seeds = tuple(self.seeds)
+        all_seeds = tuple(self.all_seeds)
+        self.undo_stack.append((letter, tuple(changed_cells), tuple(spawned), self.score-old_score,
+                                None if seeds == old_seeds else (old_seeds, seeds),
+                                None if all_seeds == old_all_seeds else (old_all_seeds, all_seeds),
+                                self.game_over))
+        self.redo_stack = []
+
+# the board the game itself plays on
+class Board(BaseBoard):
+
+    animated = True
+    journaled = True
+    
+    def __init__(self, width, height, mode=1, seed=None):
+
+        # basic variables
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.game_over = False
+
+        self.tiles = [[None for i in range(self.height)] for j in range(self.width)]
+
+        # "fake" tiles for animation
+        # each anim_tile is a tuple containing
+        # (start pos, start tile, end pos, end tile)
+        # for every tile in a line that changed (and every spawn). tiles anywhere else stayed put
+        self.anim_tiles = []
+
+        # seeds
+        # you already know what seeds are
+        self.seeds = []
+        self.all_seeds = []
+
+        # "fake" seeds for animation
+        # (seed, start index, end index)
+        self.anim_seeds = []
+
+        self.score = 0
+        self.anim_score = 0
+
+        self.preview_board = None
+
+        # savescum prevention
+        self.tainted = False
+
+        # every move so far (and every undone one), see undo
+        self.undo_stack = []
+        self.redo_stack = []
+
+        # where spawns come from, see get_rng
+        self.seed = seed
+        self.rng = None
+
+        # every move so far as MOVE_LETTERS, for replays (see pydive.replay).
+        # full_log is False for boards from profiles saved before there were logs,
+        # which only have the moves since they were loaded (and a seed picked partway through)
+        self.move_log = bytearray()
+        self.full_log = True
+
+        # bookkeeping for an empty board, see reindex
+        self.seed_counts = {}
+        self.row_stats = [line_stats((None,)*width)]*height
+        self.column_stats = [line_stats((None,)*height)]*width
+        self.empty_count = width*height
+        self.merge_counts = [0, 0]
+        self.slide_counts = [0, 0, 0, 0]
+        self.free_cells = list(range(width*height))
+        self.free_slots = list(range(width*height))
+        self.zobrist = mode_key(mode)
+        self.lookahead_cache = None
+
+    # previews are only good until the next move, no need to save them
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["preview_board"] = None
+        state["lookahead_cache"] = None
+        return state
+
+    # profiles saved by older versions don't have the bookkeeping
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "undo_stack" not in state:
+            self.undo_stack = []
+            self.redo_stack = []
+        if "move_log" not in state:
+            self.seed = None
+            self.rng = None
+            self.move_log = bytearray()
+            self.full_log = False
+        elif "full_log" not in state:
+            self.full_log = True
+        self.reindex()
+
+        # spawns pick from free_cells by position, so keep its order for the game to stay replayable
+        if "free_cells" in state:
+            self.free_cells = state["free_cells"]
+            self.free_slots = [-1]*(self.width*self.height)
+            for slot, cell in enumerate(self.free_cells):
+                self.free_slots[cell] = slot
+
+    # take back the last move. returns whether there was one.
+    # each move on the stack is
+    # (move letter, changed cells, spawned tiles, score gained, (old seeds, new seeds), (old all_seeds, new all_seeds), game over)
+    # where cells are (i*height+j, old tile, new tile), spawned tiles are (i*height+j, tile),
+    # and the seed pairs are None if the seeds didn't change.
+    # undoing counts as savescumming, so it taints the board.
+    # the move log forgets undone moves, but the random numbers they used stay used,
+    # so a game with undos in it won't replay
+    def undo(self):
+
+        if len(self.undo_stack) == 0:
+            return False
+
+        letter, changed_cells, spawned, score, seeds, all_seeds, game_over = self.undo_stack.pop()
+        self.move_log.pop()
+        for cell, tile in spawned:
+            self.set_tile(cell//self.height, cell%self.height, None)
+        for cell, old_tile, new_tile in changed_cells:
+            self.set_tile(cell//self.height, cell%self.height, old_tile)
+        self._restore(score=-score, seeds=None if seeds == None else seeds[0],
+                      all_seeds=None if all_seeds == None else all_seeds[0], game_over=False)
+
+        self.tainted = True
+        self.redo_stack.append((letter, changed_cells, spawned, score, seeds, all_seeds, game_over))
+        return True
+
+    # play an undone move again, spawn and all. returns whether there was one
+    def redo(self):
+
+        if len(self.redo_stack) == 0:
+            return False
+
+        letter, changed_cells, spawned, score, seeds, all_seeds, game_over = self.redo_stack.pop()
+        self.move_log.append(ord(letter))
+        for cell, old_tile, new_tile in changed_cells:
+            self.set_tile(cell//self.height, cell%self.height, new_tile)
+        for cell, tile in spawned:
+            self.set_tile(cell//self.height, cell%self.height, tile)
+        self._restore(score=score, seeds=None if seeds == None else seeds[1],
+                      all_seeds=None if all_seeds == None else all_seeds[1], game_over=game_over)
+
+        self.undo_stack.append((letter, changed_cells, spawned, score, seeds, all_seeds, game_over))
+        return True
+
+    # the rest of undo/redo, once the tiles are back
+    def _restore(self, score, seeds, all_seeds, game_over):
+
+        self.score += score
+        if seeds != None:
+            self.zobrist ^= seeds_hash(self.seeds) ^ seeds_hash(seeds)
+            self.seeds = list(seeds)
+            if self.mode == 0 or self.mode == 1:
+                self.seed_counts = {seed: self.seed_counts[seed] if seed in self.seed_counts else self._count_divisible(seed) for seed in self.seeds}
+        if all_seeds != None:
+            self.all_seeds = list(all_seeds)
+        self.game_over = game_over
+        self.lookahead_cache = None
+
+        # nothing to animate, everything just sits where it is
+        self.anim_tiles = []
+        self.anim_seeds = [(seed, i, i) for i, seed in enumerate(self.seeds)]
+        self.anim_score = self.score
+
+    def get_tile(self, i, j):
+        return self.tiles[i][j]
+
+    def _put_tile(self, i, j, tile):
+        self.tiles[i][j] = tile
+
+    def _get_rows(self):
+        return list(zip(*self.tiles))
+
+    def _get_columns(self):
+        return [tuple(column) for column in self.tiles]
+
+    def _get_row(self, j):
+        return tuple([column[j] for column in self.tiles])
+
+    def _get_column(self, i):
+        return tuple(self.tiles[i])
+
+    def _set_row(self, j, tiles):
+        for i, tile in enumerate(tiles):
+            self.tiles[i][j] = tile
+
+    def _set_column(self, i, tiles):
+        self.tiles[i] = list(tiles)
+
+    def copy(self):
+
+        board = type(self)(self.width, self.height, self.mode, self.seed)
+        board.tiles = [[i for i in j] for j in self.tiles]
+        board.seeds = [i for i in self.seeds]
+        board.all_seeds = [i for i in self.all_seeds]
+        board.score = self.score
+        board.anim_score = self.score
+        board.game_over = self.game_over
+        board.tainted = self.tainted
+        board.seed_counts = self.seed_counts.copy()
+        board.row_stats = self.row_stats[:]
+        board.column_stats = self.column_stats[:]
+        board.empty_count = self.empty_count
+        board.merge_counts = self.merge_counts[:]
+        board.slide_counts = self.slide_counts[:]
+        board.free_cells = self.free_cells[:]
+        board.free_slots = self.free_slots[:]
+        board.zobrist = self.zobrist
+        return board
+
+    def preview_move(self, direction):
+
+        self.preview_board = BaseBoard.preview_move(self, direction)
+        return self.preview_board
+
+# check if a new tile unlocks any seeds, given the current seeds
+# returns the new seed, or None if there is no new seed
+def find_new_seed(new_tile, seeds):
+
+    # nope, not dealing with you.
+    if new_tile == 0 or new_tile == None:
+        return None
+    return _find_new_seed(abs(new_tile), tuple(seeds))
+
+# each seed with its prime factors. seed lists don't change often
+@lru_cache(maxsize=256)
+def _factor_seeds(seeds):
+    return tuple((seed, primes.factorize(seed)) for seed in set(seeds))
+
+# the same tiles keep turning up with the same seeds, so the answers are cached
+@lru_cache(maxsize=SEED_CACHE_SIZE)
+def _find_new_seed(tile, seeds):
+
+    # only seeds made of the tile's own primes can divide any of it
+    powers = dict(primes.factorize(tile))
+    usable = []
+    all_prime = True
+    for seed, factors in _factor_seeds(seeds):
+        for prime, power in factors:
+            if powers.get(prime, 0) < power:
+                break
+        else:
+            usable.append(seed)
+            all_prime = all_prime and factors == ((seed, 1),)
+
+    # prime seeds can just be divided out as many times as they go,
+    # nothing else gets any lower. no new seed if that leaves nothing
+    if all_prime:
+        rest = tile
+        for seed in usable:
+            rest //= seed**powers[seed]
+        if rest == 1 and len(usable) > 0:
+            return None
+        return rest
+
+    # otherwise divide by seeds every way possible
+    potentials = [tile]
+    seen = {tile}
+    smallest = tile
+
+    while len(potentials) > 0:
+
+        # take a potential seed
+        test = potentials.pop()
+
+        # divide it by each of the existing seeds
+        for seed in usable:
+            if test % seed == 0:
+
+                # if the result is 1, no new seed
+                if test == seed:
+                    return None
+
+                # otherwise, add it to the set
+                if test//seed not in seen:
+                    seen.add(test//seed)
+                    potentials.append(test//seed)
+
+        # keep track of the smallest seed
+        if smallest > test:
+            smallest = test
+
+    return smallest
+
+# check if two tiles are mergeable
+def check_merge(tile1, tile2):
+    if tile1 == None or tile2 == None or tile1 == "rock" or tile2 == "rock":
+        return None
+    # two tiles are mergeable if one is a factor of the other
+    # or one of them is 0 i guess
+    if tile1 == 0 or tile2 == 0 or tile1 % tile2 == 0 or tile2 % tile1 == 0:
+        return tile1 + tile2
+    return None
+
+# a copy of rng that carries on from the same place without touching rng (None for None),
+# for a board that carries on the same game as another, like CompactBoard.from_board
+def fork_rng(rng):
+    if rng == None:
+        return None
+    forked = random.Random()
+    forked.setstate(rng.getstate())
+    return forked
+
+# whether an array("q") can hold n
+def _fits_int64(n):
+    return -2**63 <= n < 2**63
+
+# play a string of MOVE_LETTERS like "LLURD" on board with step().
+# returns (outcomes, new_seeds): outcomes is an array of STEP_FIELDS numbers per move,
+# flags (STEP_MOVED, STEP_GAME_OVER), score gained, and the start and end in
+# new_seeds of the seeds that move added.
+# they're array("q")s, unless a score or seed gets too big for 64 bits: then that one's a list
+def apply_moves(board, moves):
+
+    directions = {letter: direction for direction, letter in MOVE_LETTERS.items()}
+    outcomes = array("q", bytes(8*STEP_FIELDS*len(moves)))
+    new_seeds = array("q")
+
+    for n, letter in enumerate(moves):
+        score = board.score
+        seeds = board.seeds[:]
+        moved = board.step(directions[letter])
+
+        start = len(new_seeds)
+        if board.seeds != seeds:
+            found = [seed for seed in board.seeds if seed not in seeds]
+            if isinstance(new_seeds, array) and not all(_fits_int64(seed) for seed in found):
+                new_seeds = new_seeds.tolist()
+            new_seeds.extend(found)
+
+        gained = board.score-score
+        if isinstance(outcomes, array) and not _fits_int64(gained):
+            outcomes = outcomes.tolist()
+
+        outcome = n*STEP_FIELDS
+        outcomes[outcome] = (STEP_MOVED if moved else 0) | (STEP_GAME_OVER if board.game_over else 0)
+        outcomes[outcome+1] = gained
+        outcomes[outcome+2] = start
+        outcomes[outcome+3] = len(new_seeds)
+
+    return outcomes, new_seeds
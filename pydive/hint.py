@@ -0,0 +1,120 @@
+# the solver's best move for whatever's on the board, worked out on a background thread
+# so the game never waits for it. start() a search whenever the board changes: it goes
+# deeper and deeper until max_depth, time_budget_ms or the next start() (or cancel()), and best
+# always holds the best move found so far, or None if it hasn't finished a single depth yet.
+#
+# the search shares the interpreter with the game, so it works in slices and sleeps in between
+# (see SlicedStop), rather than the game having to fight it for the cpu every frame.
+import threading
+import time
+
+from pydive.compact import CompactBoard
+from pydive.solver import Solver
+
+# how deep a hint looks, and for how long, before it stops and lets the game have the cpu back
+HINT_DEPTH = 6
+HINT_TIME_MS = 2000
+# the search runs for SLICE_MS at a time, then sleeps for PAUSE_MS so the game's thread gets a turn
+SLICE_MS = 2
+PAUSE_MS = 1
+# boards with more cells than this don't get hints, searching them would only slow the game down
+MAX_HINT_CELLS = 400
+
+# a stop event for the solver, which checks it at every node. that makes it the spot
+# where the search notices its slice is up and sleeps (letting go of the gil) for a bit
+class SlicedStop(threading.Event):
+
+    def __init__(self):
+        super().__init__()
+        self.slice_end = time.perf_counter()+SLICE_MS/1000
+
+    def is_set(self):
+        if time.perf_counter() > self.slice_end:
+            time.sleep(PAUSE_MS/1000)
+            self.slice_end = time.perf_counter()+SLICE_MS/1000
+        return super().is_set()
+
+    # is_set without the sleep, for checking it anywhere but inside the search
+    # (never while holding a lock the game waits on)
+    def cancelled(self):
+        return super().is_set()
+
+class HintWorker:
+
+    def __init__(self, max_depth=HINT_DEPTH, time_budget_ms=HINT_TIME_MS, max_cells=MAX_HINT_CELLS, seed=None):
+
+        self.max_depth = max_depth
+        self.time_budget_ms = time_budget_ms
+        self.max_cells = max_cells
+        # only ever used on the worker thread, so its table carries over between moves
+        self.solver = Solver(seed=seed)
+
+        # everything below is shared with the worker, so it's only touched holding lock
+        self.lock = threading.Condition()
+        self.job = None
+        self.stop = None
+        self.best = None
+        self.depth = 0
+
+        self.thread = None
+
+    # whether board is too big to get hints at all
+    def too_big(self, board):
+        return board.width*board.height > self.max_cells
+
+    # search board from scratch, dropping whatever was being searched before
+    def start(self, board):
+
+        if self.too_big(board):
+            self.cancel()
+            return
+
+        # a copy, so the game can carry on moving the real board around
+        board = CompactBoard.from_board(board)
+        with self.lock:
+            if self.stop != None:
+                self.stop.set()
+            self.stop = SlicedStop()
+            self.job = (board, self.stop)
+            self.best = None
+            self.depth = 0
+            self.lock.notify()
+
+        if self.thread == None:
+            self.thread = threading.Thread(target=self.run, name="pydive hints", daemon=True)
+            self.thread.start()
+
+    def cancel(self):
+        with self.lock:
+            if self.stop != None:
+                self.stop.set()
+            self.job = None
+            self.best = None
+            self.depth = 0
+
+    # (best move so far, how deep it looked) for whoever's drawing it
+    def get_hint(self):
+        with self.lock:
+            return self.best, self.depth
+
+    def found(self, stop, move, depth):
+        with self.lock:
+            # a search that's been replaced can still finish a depth before it notices
+            if stop is self.stop and not stop.cancelled():
+                self.best = move
+                self.depth = depth
+
+    def run(self):
+
+        while True:
+            with self.lock:
+                while self.job == None:
+                    self.lock.wait()
+                board, stop = self.job
+                self.job = None
+
+            move = self.solver.best_move(board, self.time_budget_ms, self.max_depth, stop=stop,
+                                         callback=lambda move, depth: self.found(stop, move, depth))
+            # boards with only one move don't get searched at all, so they never call back
+            if self.solver.depth == 0 and move != None:
+                self.found(stop, move, 0)
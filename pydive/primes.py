@@ -0,0 +1,119 @@
+# prime factors of tiles, worked out once per process and remembered.
+# the engine finds seeds from them and dive.py colours and decorates tiles with them,
+# so the same big numbers don't get trial divided over and over.
+import math
+import random
+from functools import lru_cache
+
+# how many numbers factorize remembers
+FACTOR_CACHE_SIZE = 2**16
+
+# trial division goes up to this, anything bigger left over gets pollard's rho
+TRIAL_LIMIT = 1000
+
+# gaps between numbers coprime to 2, 3 and 5, starting from 7
+WHEEL = [4, 2, 4, 2, 4, 6, 2, 6]
+
+# enough witnesses to make miller-rabin exact below 3.3*10**24 (and very nearly everywhere else)
+WITNESSES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+def is_prime(n):
+
+    if n < 2:
+        return False
+    for p in WITNESSES:
+        if n % p == 0:
+            return n == p
+
+    d = n-1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n-1:
+            continue
+        for r in range(s-1):
+            x = x*x % n
+            if x == n-1:
+                break
+        else:
+            return False
+    return True
+
+# some factor of n (a composite with no small factors), brent's version of pollard's rho
+def find_factor(n):
+
+    rng = random.Random(n)
+    while True:
+        y = rng.randrange(1, n)
+        c = rng.randrange(1, n)
+        m = 128
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for i in range(r):
+                y = (y*y+c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for i in range(min(m, r-k)):
+                    y = (y*y+c) % n
+                    q = q*abs(x-y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # went round the loop without noticing, step through it one at a time
+            g = 1
+            while g == 1:
+                ys = (ys*ys+c) % n
+                g = math.gcd(abs(x-ys), n)
+        if g != n:
+            return g
+
+# the prime factors of abs(n) as ((prime, power), ...) from smallest to biggest.
+# 0 and 1 have none
+@lru_cache(maxsize=FACTOR_CACHE_SIZE)
+def factorize(n):
+
+    n = abs(n)
+    if n < 2:
+        return ()
+
+    factors = {}
+    for p in (2, 3, 5):
+        while n % p == 0:
+            factors[p] = factors.get(p, 0)+1
+            n //= p
+
+    p = 7
+    gap = 0
+    while n > 1 and p <= TRIAL_LIMIT and p*p <= n:
+        while n % p == 0:
+            factors[p] = factors.get(p, 0)+1
+            n //= p
+        p += WHEEL[gap]
+        gap = (gap+1) % len(WHEEL)
+
+    # whatever's left has no factors below p
+    if n > 1:
+        if p*p > n or is_prime(n):
+            factors[n] = factors.get(n, 0)+1
+        else:
+            for prime, power in _split(n).items():
+                factors[prime] = factors.get(prime, 0)+power
+
+    return tuple(sorted(factors.items()))
+
+# the factors of a big composite with nothing small in it
+def _split(n):
+    if is_prime(n):
+        return {n: 1}
+    factor = find_factor(n)
+    factors = _split(factor)
+    for prime, power in _split(n//factor).items():
+        factors[prime] = factors.get(prime, 0)+power
+    return factors
@@ -0,0 +1,38 @@
+# games written down as (seed, mode, (width, height), moves), where moves is a string
+# of engine.MOVE_LETTERS like "LLURD". that's all it takes to play a game again,
+# since every spawn comes out of the board's own seeded rng.
+from pydive import engine
+
+LETTER_MOVES = {letter: direction for direction, letter in engine.MOVE_LETTERS.items()}
+
+# the log of a game played on a journaled board (like engine.Board).
+# only replays if the board's full_log says it has every move since setup
+def game_log(board):
+    return (board.seed, board.mode, (board.width, board.height), board.move_log.decode())
+
+# play a logged game again from the start, without any animation or undo bookkeeping.
+# returns the board as it ends up
+# raises ValueError if the log has a move that doesn't do anything, which means it's
+# from some other game (or one with undos in it)
+def replay(log, board_type=engine.Board):
+
+    seed, mode, (width, height), moves = log
+
+    board = board_type(width, height, mode, seed)
+    if board.journaled:
+        board.journaled = False
+    board.setup()
+
+    for n, letter in enumerate(moves):
+        if not board.step(LETTER_MOVES[letter]):
+            raise ValueError(f"move {n+1} ({letter}) doesn't do anything")
+
+    return board
+
+# whether a logged game really ends with the score and tiles (laid out like Board.tiles) it says it does
+def verify(log, score, tiles, board_type=engine.Board):
+    try:
+        board = replay(log, board_type)
+    except ValueError:
+        return False
+    return board.score == score and board.tiles == tiles
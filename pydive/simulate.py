@@ -0,0 +1,100 @@
+# lots of games with no one watching, spread over a pool of processes.
+# games are handed out in chunks, each with its own seed, so a run comes out the same
+# whatever the number of workers (only the order results stream in changes).
+import multiprocessing
+import random
+
+from pydive.compact import CompactBoard
+
+CHUNK_SIZE = 200
+
+# policies pick a move for a board out of its legal moves.
+# they get the chunk's rng so runs stay repeatable
+
+def random_policy(board, moves, rng):
+    return rng.choice(moves)
+
+# the move that scores the most right now, ties broken at random
+def greedy_policy(board, moves, rng):
+    outcomes = board.lookahead()
+    best = max(outcomes[move].score for move in moves)
+    return rng.choice([move for move in moves if outcomes[move].score == best])
+
+POLICIES = {"random": random_policy, "greedy": greedy_policy}
+
+# play one game to the end (or max_moves)
+# returns the board and how many moves it took
+def play_game(board, policy, rng, max_moves=None):
+
+    moves = 0
+    while not board.game_over and (max_moves == None or moves < max_moves):
+        legal_moves = board.legal_moves()
+        if len(legal_moves) == 0:
+            break
+        board.move(policy(board, legal_moves, rng))
+        moves += 1
+
+    return board, moves
+
+# an empty tally of games, which results() streams and merge() adds up.
+# scores and moves map a score (or move count) to how many games had it,
+# svalbard maps seeds to how many games found them, just like a profile's stats["svalbard"]
+def new_results():
+    return {"games": 0, "moves": 0, "scores": {}, "svalbard": {}, "moves_per_game": {}}
+
+def merge(results, other):
+    results["games"] += other["games"]
+    results["moves"] += other["moves"]
+    for key in ("scores", "svalbard", "moves_per_game"):
+        for value, count in other[key].items():
+            results[key][value] = results[key].get(value, 0)+count
+    return results
+
+# a work unit: (mode, width, height, policy name, games, seed, max_moves)
+# runs in a worker process, so it only takes and returns plain data
+def run_chunk(chunk):
+
+    mode, width, height, policy, games, seed, max_moves = chunk
+    policy = POLICIES[policy]
+    rng = random.Random(seed)
+
+    results = new_results()
+    for n in range(games):
+        board = CompactBoard(width, height, mode, rng.getrandbits(64))
+        board.setup()
+        board, moves = play_game(board, policy, rng, max_moves)
+
+        results["games"] += 1
+        results["moves"] += moves
+        results["scores"][board.score] = results["scores"].get(board.score, 0)+1
+        results["moves_per_game"][moves] = results["moves_per_game"].get(moves, 0)+1
+        for seed in board.all_seeds:
+            results["svalbard"][seed] = results["svalbard"].get(seed, 0)+1
+
+    return results
+
+def chunks(mode, width, height, policy, games, seed, max_moves, chunk_size):
+    rng = random.Random(seed)
+    for start in range(0, games, chunk_size):
+        yield (mode, width, height, policy, min(chunk_size, games-start), rng.getrandbits(64), max_moves)
+
+# play games over workers processes (all of them if None)
+# yields the running totals (see new_results) every time a chunk finishes
+def results(mode, width, height, games, policy="random", workers=None, seed=None, max_moves=None, chunk_size=CHUNK_SIZE):
+
+    if policy not in POLICIES:
+        raise ValueError(f"unknown policy {policy}, pick one of {', '.join(POLICIES)}")
+    if seed == None:
+        seed = random.getrandbits(64)
+
+    work = chunks(mode, width, height, policy, games, seed, max_moves, chunk_size)
+    totals = new_results()
+
+    if workers == 1:
+        for chunk in work:
+            yield merge(totals, run_chunk(chunk))
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        for chunk_results in pool.imap_unordered(run_chunk, work):
+            yield merge(totals, chunk_results)
@@ -0,0 +1,189 @@
+# an expectimax player: max over our moves, average over where the next tile spawns.
+# searches deeper and deeper until time runs out (or someone calls stop),
+# keeping positions it has already worked out in a transposition table.
+import random
+import time
+
+from pydive import engine
+from pydive.compact import CompactBoard
+
+# how many positions the table holds before it starts over
+TABLE_SIZE = 2**18
+
+# spawns looked at per chance node. boards with more empty cells (times seeds)
+# than this get a random sample of them instead
+SPAWN_SAMPLES = 8
+
+# what the evaluation adds to the score for each empty cell and each pair of tiles that could merge
+EMPTY_WEIGHT = 8
+MERGE_WEIGHT = 4
+
+# the cell each cell goes to under each symmetry of a width x height board
+# (cells numbered i*height+j like CompactBoard.cells)
+def symmetries(width, height):
+
+    def cell(i, j):
+        return i*height+j
+
+    maps = [
+        [cell(i, j) for i in range(width) for j in range(height)],
+        [cell(width-1-i, j) for i in range(width) for j in range(height)],
+        [cell(i, height-1-j) for i in range(width) for j in range(height)],
+        [cell(width-1-i, height-1-j) for i in range(width) for j in range(height)],
+    ]
+    # square boards can also be turned a quarter and flipped along the diagonals
+    if width == height:
+        maps += [
+            [cell(j, i) for i in range(width) for j in range(height)],
+            [cell(width-1-j, i) for i in range(width) for j in range(height)],
+            [cell(j, height-1-i) for i in range(width) for j in range(height)],
+            [cell(width-1-j, height-1-i) for i in range(width) for j in range(height)],
+        ]
+    return maps
+
+# stop searching, the time's up
+class SearchTimeout(Exception):
+    pass
+
+class Solver:
+
+    def __init__(self, table_size=TABLE_SIZE, seed=None):
+
+        # canonical hash -> (depth searched, value minus the score at the time)
+        self.table = {}
+        self.table_size = table_size
+        self.rng = random.Random(seed)
+        self.symmetry_cache = {}
+
+        # set by best_move
+        self.deadline = None
+        self.stop = None
+
+        # how deep the last best_move got, and counters for the benchmark
+        self.depth = 0
+        self.nodes = 0
+        self.lookups = 0
+        self.hits = 0
+
+    # the same key for a board and all its mirror images and rotations: the zobrist hash
+    # of whichever image has the smallest cells, so the table holds a 64 bit int per entry
+    # however big the board is
+    def canonical_key(self, board):
+
+        size = (board.width, board.height)
+        if size not in self.symmetry_cache:
+            self.symmetry_cache[size] = symmetries(board.width, board.height)
+        cells = board.cells
+        image = min(tuple([cells[k] for k in cell_map]) for cell_map in self.symmetry_cache[size])
+        key = engine.seeds_hash(board.seeds) ^ engine.mode_key(board.mode)
+        for cell, tile in enumerate(image):
+            key ^= engine.zobrist_key(tile, cell)
+        return key
+
+    # how good a board looks, without searching any further
+    def evaluate(self, board):
+        if board.game_over:
+            return board.score
+        return board.score+EMPTY_WEIGHT*board.empty_count+MERGE_WEIGHT*(board.merge_counts[0]+board.merge_counts[1])
+
+    # the best of DIRECTIONS for board, thinking for about time_budget_ms
+    # (or until depth max_depth, or until stop.is_set() for something like a threading.Event).
+    # callback(move, depth) hears about the best move each time a depth is finished.
+    # returns None if no move does anything
+    # raises ValueError if there's nothing to stop it, it would search forever
+    def best_move(self, board, time_budget_ms=None, max_depth=None, stop=None, callback=None):
+
+        if time_budget_ms == None and max_depth == None and stop == None:
+            raise ValueError("best_move needs a time_budget_ms, max_depth or stop")
+        if not isinstance(board, CompactBoard):
+            board = CompactBoard.from_board(board)
+        self.deadline = None if time_budget_ms == None else time.perf_counter()+time_budget_ms/1000
+        self.stop = stop
+
+        legal_moves = board.legal_moves()
+        if len(legal_moves) == 0:
+            return None
+        best = legal_moves[0]
+        if len(legal_moves) == 1:
+            return best
+
+        self.depth = 0
+        while max_depth == None or self.depth < max_depth:
+            try:
+                best = self.search_root(board, self.depth+1)
+            except SearchTimeout:
+                break
+            self.depth += 1
+            if callback != None:
+                callback(best, self.depth)
+
+        return best
+
+    def search_root(self, board, depth):
+
+        outcomes = board.lookahead()
+        best, best_value = None, None
+        for move in engine.DIRECTIONS:
+            if outcomes[move] == None:
+                continue
+            value = self.chance_value(outcomes[move], depth)
+            if best_value == None or value > best_value:
+                best, best_value = move, value
+        return best
+
+    # the best a player can expect from board, looking depth moves ahead
+    def max_value(self, board, depth):
+
+        self.nodes += 1
+        if (self.deadline != None and time.perf_counter() > self.deadline) or (self.stop != None and self.stop.is_set()):
+            raise SearchTimeout
+
+        if depth == 0 or board.game_over:
+            return self.evaluate(board)
+
+        key = self.canonical_key(board)
+        self.lookups += 1
+        if key in self.table and self.table[key][0] >= depth:
+            self.hits += 1
+            return board.score+self.table[key][1]
+
+        best_value = None
+        outcomes = board.lookahead()
+        for move in engine.DIRECTIONS:
+            if outcomes[move] == None:
+                continue
+            value = self.chance_value(outcomes[move], depth)
+            if best_value == None or value > best_value:
+                best_value = value
+        # nothing moves but the game isn't over (rocks, or no seeds left to spawn)
+        if best_value == None:
+            best_value = self.evaluate(board)
+
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, best_value-board.score)
+        return best_value
+
+    # what to expect once a tile spawns on board (a move that hasn't spawned yet)
+    def chance_value(self, board, depth):
+
+        spawns = [(cell, seed) for cell in board.free_cells for seed in board.seeds]
+        if len(spawns) == 0:
+            return self.max_value(board, depth-1)
+        if len(spawns) > SPAWN_SAMPLES:
+            spawns = self.rng.sample(spawns, SPAWN_SAMPLES)
+
+        total = 0
+        for cell, seed in spawns:
+            child = board.copy()
+            child.set_tile(cell//board.height, cell%board.height, seed)
+            child.check_for_game_over()
+            total += self.max_value(child, depth-1)
+        return total/len(spawns)
+
+    def hit_rate(self):
+        return self.hits/self.lookups if self.lookups > 0 else 0.0
+
+# one-off search with a fresh table
+def best_move(board, time_budget_ms, seed=None):
+    return Solver(seed=seed).best_move(board, time_budget_ms)
@@ -0,0 +1,262 @@
+# exact answers for tiny boards (1xN, 2x2, 2x3, 3x3): every position reachable from the start
+# gets its expected score under perfect play, worked out backwards from the end.
+#
+# tiles can grow forever, so a tablebase stops at a tile sum of max_sum: each move spawns
+# a tile and merges keep the sum, so the sum goes up every move, and everything past the cap
+# counts as worth nothing more. the values are "the most score you can expect to make
+# before the tiles add up to more than max_sum (or the game ends)". that also means every
+# position only leads to bigger sums, so one sweep from the biggest sum down does it.
+#
+# the table is a file of (fingerprint, position, value) slots in an open addressing hash table,
+# read through mmap, so a lookup is a hash and a probe or two. the position is stored whole
+# (it's only a few bytes on boards this small) so two positions can never share a value.
+import hashlib
+import mmap
+import struct
+from array import array
+
+from pydive import engine
+from pydive.compact import CompactBoard, EMPTY, ROCK
+from pydive.solver import symmetries
+
+# sensible caps for each size, big enough to be interesting and small enough to build in seconds
+MAX_SUMS = {(1, 3): 192, (1, 4): 128, (1, 5): 96, (2, 2): 40, (2, 3): 24, (3, 3): 18}
+
+MAGIC = b"PYDIVETB"
+VERSION = 2
+# magic, version, width, height, mode, max_sum, capacity, count, key size
+HEADER = struct.Struct("<8sIIIIqQQI")
+
+# cells and seeds go in the key as 16 bit numbers, with these standing in for empty cells and rocks.
+# empty also pads the seeds out to the table's key size
+EMPTY_CODE = -2**15
+ROCK_CODE = EMPTY_CODE+1
+PADDING = array("h", [EMPTY_CODE]).tobytes()
+
+# whether a tile (or seed) has room in a key. ones that don't can't be in a table either
+def _fits(tile):
+    return ROCK_CODE < tile < -EMPTY_CODE
+
+# a tile of a Board or a CompactBoard as it goes in a key, or None if it doesn't fit
+def _code(tile):
+    if tile == None or tile == EMPTY:
+        return EMPTY_CODE
+    if tile == "rock" or tile == ROCK:
+        return ROCK_CODE
+    return tile if _fits(tile) else None
+
+# board's cells as they go in a key (numbered i*height+j), or None if any of them
+# or its seeds don't fit
+def _codes(board):
+    if isinstance(board, CompactBoard):
+        codes = [_code(tile) for tile in board.cells]
+    else:
+        codes = [_code(tile) for column in board.tiles for tile in column]
+    if None in codes or not all(_fits(seed) for seed in board.seeds):
+        return None
+    return codes
+
+def _pad(key, size):
+    return key+PADDING*((size-len(key))//len(PADDING))
+
+# the key is the same for every mirror image and rotation of a board: the smallest of its
+# images' cells, then its seeds in order. the fingerprint is a hash of the key for finding its slot
+class Fingerprinter:
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.images = symmetries(width, height)
+
+    def _key(self, codes, seeds):
+        cells = min(tuple([codes[k] for k in cell_map]) for cell_map in self.images)
+        return array("h", cells+tuple(sorted(seeds))).tobytes()
+
+    # board's key, or None if it has tiles too big for one
+    def key(self, board):
+        codes = _codes(board)
+        return None if codes == None else self._key(codes, board.seeds)
+
+    def fingerprint(self, key):
+        # 0 marks an empty slot in the file
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+    # keys of every board a spawn can make from board (a move that hasn't spawned yet)
+    # as [(key, cell, seed)], with None for keys if board has tiles too big for one
+    def spawn_keys(self, board):
+        codes = _codes(board)
+        spawns = []
+        for cell in board.free_cells:
+            for seed in board.seeds:
+                if codes == None:
+                    spawns.append((None, cell, seed))
+                    continue
+                codes[cell] = seed
+                spawns.append((self._key(codes, board.seeds), cell, seed))
+            if codes != None:
+                codes[cell] = EMPTY_CODE
+        return spawns
+
+def tile_sum(board):
+    return sum(tile for tile in board.cells if tile > ROCK)
+
+# pack a position away and get it back, without all the bookkeeping in between
+def _pack(board):
+    return board.cells.tobytes(), tuple(board.seeds)
+
+def _unpack(width, height, mode, packed):
+    board = CompactBoard(width, height, mode)
+    board.cells = array("q")
+    board.cells.frombytes(packed[0])
+    board.seeds = list(packed[1])
+    board.all_seeds = list(packed[1])
+    board.reindex()
+    return board
+
+# each legal move from board as (score gained, the board it leaves before the spawn)
+def _moves(board):
+    return [(after.score-board.score, after) for after in board.lookahead().values() if after != None]
+
+# sweep every position reachable from the start of a width x height game in mode
+# and write the tablebase to path. returns how many positions it holds
+def build(width, height, mode, path, max_sum=None):
+
+    if max_sum == None:
+        max_sum = MAX_SUMS.get((width, height), MAX_SUMS.get((height, width), 16))
+    if max_sum >= -ROCK_CODE:
+        raise ValueError(f"max_sum has to be under {-ROCK_CODE}")
+    fingerprinter = Fingerprinter(width, height)
+
+    # every position, grouped by tile sum: sum -> {key: packed board}
+    positions = {}
+
+    def add(key, board, total):
+        bucket = positions.setdefault(total, {})
+        if key not in bucket:
+            bucket[key] = _pack(board)
+
+    # the game starts with two spawns on an empty board
+    start = CompactBoard(width, height, mode)
+    start.seeds = list(engine.STARTING_SEEDS.get(mode, []))
+    start.all_seeds = list(start.seeds)
+    start.reindex()
+    for key, cell, seed in fingerprinter.spawn_keys(start):
+        first = start.copy()
+        first.set_tile(cell//height, cell%height, seed)
+        for key, cell, seed in fingerprinter.spawn_keys(first):
+            if tile_sum(first)+seed <= max_sum:
+                board = first.copy()
+                board.set_tile(cell//height, cell%height, seed)
+                add(key, board, tile_sum(board))
+
+    # forwards: find everything reachable, smallest sums first
+    done = set()
+    while True:
+        remaining = [total for total in positions if total not in done]
+        if len(remaining) == 0:
+            break
+        total = min(remaining)
+        done.add(total)
+        for packed in positions[total].values():
+            board = _unpack(width, height, mode, packed)
+            for gain, after in _moves(board):
+                for key, cell, seed in fingerprinter.spawn_keys(after):
+                    if total+seed > max_sum:
+                        continue
+                    if key not in positions.get(total+seed, {}):
+                        child = after.copy()
+                        child.set_tile(cell//height, cell%height, seed)
+                        add(key, child, total+seed)
+
+    # backwards: a position is worth its best move, a move is worth the score it makes
+    # plus the average of whatever it can spawn into. no seeds left means no spawns,
+    # and that counts as the end too (slides could go back and forth forever otherwise)
+    values = {}
+    for total in sorted(positions, reverse=True):
+        for key, packed in positions[total].items():
+            board = _unpack(width, height, mode, packed)
+            best = 0.0
+            for gain, after in _moves(board):
+                spawns = fingerprinter.spawn_keys(after)
+                future = sum(values.get(child, 0.0) for child, cell, seed in spawns)/len(spawns) if len(spawns) > 0 else 0.0
+                best = max(best, gain+future)
+            values[key] = best
+
+    _write(path, width, height, mode, max_sum, fingerprinter, values)
+    return len(values)
+
+def _write(path, width, height, mode, max_sum, fingerprinter, values):
+
+    capacity = 1
+    while capacity < len(values)*2:
+        capacity *= 2
+
+    # every key padded out to the longest (positions can have different numbers of seeds)
+    key_size = max((len(key) for key in values), default=0)
+    slot_format = struct.Struct(f"<Q{key_size}sd")
+    slots = bytearray(slot_format.size*capacity)
+    for key, value in values.items():
+        fingerprint = fingerprinter.fingerprint(key)
+        slot = fingerprint & (capacity-1)
+        while struct.unpack_from("<Q", slots, slot*slot_format.size)[0] != 0:
+            slot = (slot+1) & (capacity-1)
+        slot_format.pack_into(slots, slot*slot_format.size, fingerprint, _pad(key, key_size), value)
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, width, height, mode, max_sum, capacity, len(values), key_size))
+        file.write(slots)
+
+class Tablebase:
+
+    def __init__(self, path):
+
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from("<8sI", self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} isn't a pydive tablebase (or is from another version)")
+        magic, version, self.width, self.height, self.mode, self.max_sum, self.capacity, self.count, self.key_size = HEADER.unpack_from(self.data, 0)
+        self.slot = struct.Struct(f"<Q{self.key_size}sd")
+        self.fingerprinter = Fingerprinter(self.width, self.height)
+
+    def close(self):
+        self.data.close()
+
+    def _probe(self, key):
+        if key == None or len(key) > self.key_size:
+            return None
+        fingerprint = self.fingerprinter.fingerprint(key)
+        padded = _pad(key, self.key_size)
+        slot = fingerprint & (self.capacity-1)
+        while True:
+            stored, stored_key, value = self.slot.unpack_from(self.data, HEADER.size+slot*self.slot.size)
+            if stored == fingerprint and stored_key == padded:
+                return value
+            if stored == 0:
+                return None
+            slot = (slot+1) & (self.capacity-1)
+
+    # the expected score still to come from board with perfect play (see the top of this file),
+    # or None if the table doesn't have it (past max_sum, or not reachable in a real game)
+    def lookup(self, board):
+
+        if (board.width, board.height, board.mode) != (self.width, self.height, self.mode):
+            raise ValueError("board doesn't match the tablebase")
+        return self._probe(self.fingerprinter.key(board))
+
+    # the best of DIRECTIONS according to the table, or None if no move does anything
+    def best_move(self, board):
+
+        best, best_value = None, None
+        for move, after in board.lookahead().items():
+            if after == None:
+                continue
+            spawns = self.fingerprinter.spawn_keys(after)
+            future = 0.0
+            for child, cell, seed in spawns:
+                value = self._probe(child)
+                future += 0.0 if value == None else value
+            value = after.score-board.score+(future/len(spawns) if len(spawns) > 0 else 0.0)
+            if best_value == None or value > best_value:
+                best, best_value = move, value
+        return best